@@ -1,9 +1,16 @@
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
 import requests
 import pandas as pd
 from io import StringIO
 from datetime import date, timedelta
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
 import streamlit as st
 from config import Config
+from minute_index import MINUTES_PER_DAY, MinuteIndex, hhmm_to_minute
+from hedge import get_hedger
 
 COL_NAMES = [
     "YYMMDDHHMI", "STN", "WD1", "WS1", "WDS", "WSS",
@@ -13,37 +20,254 @@ COL_NAMES = [
 
 def make_api_url(date_obj: date, auth_key: str, time_start: str, time_end: str, stn=Config.STATION_CODE) -> str:
     ymd = date_obj.strftime('%Y%m%d')
-    return f"https://apihub.kma.go.kr/api/typ01/cgi-bin/url/nph-aws2_min?tm1={ymd}{time_start}&tm2={ymd}{time_end}&stn={stn}&disp=0&help=0&authKey={auth_key}"
+    return f"{Config.API_BASE_URL}/api/typ01/cgi-bin/url/nph-aws2_min?tm1={ymd}{time_start}&tm2={ymd}{time_end}&stn={stn}&disp=0&help=0&authKey={auth_key}"
 
 def is_cache_applicable(date_obj: date, today=None) -> bool:
     if today is None:
         today = date.today()
     return (today - timedelta(days=31)) <= date_obj < today
 
-@st.cache_data(show_spinner=False, ttl=21600)
-def fetch_rain_data_cached(date_obj: date, auth_key: str, time_start="1000", time_end="1600"):
-    df = fetch_rain_data_raw(date_obj, auth_key, time_start, time_end)
-    if df is None:
-        # 실패 시 캐시에 저장하지 않도록 예외 발생
-        raise ValueError(f"API 실패로 캐시 저장 안 함: {date_obj}")
-    return df
+def remaining_timeout(deadline: float | None) -> float:
+    # 전체 조회 예산(deadline)에서 요청별 타임아웃 산출
+    if deadline is None:
+        return Config.REQUEST_TIMEOUT
+    return min(Config.REQUEST_TIMEOUT, deadline - time.monotonic())
 
-def fetch_rain_data(date_obj: date, auth_key: str, time_start="1000", time_end="1600"):
-    today = date.today()
-    try:
+
+def _mark_accepted(index: MinuteIndex, accepted: np.ndarray | None) -> MinuteIndex:
+    # 오랜 재시도 끝에 관측 없음으로 확정된 분은 "비 없음"으로 채우되 합성 분으로 표시
+    # (판정에는 쓰지만 그 시간창 결과는 확정 저장하지 않음)
+    if accepted is None:
+        return index
+    fill = accepted & ~index.present
+    if not fill.any():
+        return index
+    return index.merge(MinuteIndex(np.zeros(MINUTES_PER_DAY, dtype=bool), fill, fill))
+
+
+class CachedFrame:
+    def __init__(self, time_start: str, time_end: str, index: MinuteIndex, fetched_at: float | None = None, gap_retries: dict | None = None, gap_accepted: np.ndarray | None = None):
+        self.time_start = time_start
+        self.time_end = time_end
+        self.index = index
+        self.fetched_at = time.monotonic() if fetched_at is None else fetched_at
+        # 이 데이터를 만든 시각의 분 (오늘 데이터는 같은 분 안에서만 최신으로 봄)
+        self.fetched_minute = int(time.time() // 60)
+        # 재조회 후에도 빠진 분 -> (시도 횟수, 다음 재시도 시각, 처음 빠진 것을 확인한 시각)
+        self.gap_retries = gap_retries or {}
+        self.gap_accepted = gap_accepted
+
+    def missing_ranges(self, time_start: str, time_end: str) -> list[tuple[str, str]]:
+        return self.index.missing_ranges(time_start, time_end, Config.GAP_MERGE_MINUTES)
+
+    def due_gap_ranges(self, time_start: str, time_end: str) -> list[tuple[str, str]]:
+        # 재시도 대기 중인 분을 뺀, 지금 다시 조회할 빠진 분 구간
+        now = time.monotonic()
+        waiting = [m for m, (_, retry_at, _) in self.gap_retries.items() if retry_at > now]
+        skip = None
+        if waiting:
+            skip = np.zeros(MINUTES_PER_DAY, dtype=bool)
+            skip[waiting] = True
+        return self.index.missing_ranges(time_start, time_end, Config.GAP_MERGE_MINUTES, skip)
+
+    def decides(self, time_start: str, time_end: str, allow_trailing_gap: bool = False) -> bool:
+        # 비가 이미 확인됐거나 빠진 분이 없으면 이 데이터만으로 시간창 판정 가능
+        return self.index.rain_count(time_start, time_end) > 0 or not self.has_unfilled_gaps(time_start, time_end, allow_trailing_gap)
+
+    def has_unfilled_gaps(self, time_start: str, time_end: str, allow_trailing_gap: bool = False) -> bool:
+        # check_bipo_status 와 같은 기준: 진행 중인 날은 아직 수신되지 않았을 수 있는 마지막 분들 제외
+        trailing_grace = Config.GAP_SETTLE_MINUTES if allow_trailing_gap else 0
+        return self.index.missing_count(time_start, time_end, trailing_grace) > 0
+
+    def is_fresh(self, date_obj: date, today=None) -> bool:
+        if today is None:
+            today = date.today()
+        # 31일보다 지난 날은 더 이상 바뀌지 않으므로 재조회하지 않음
+        if date_obj < today - timedelta(days=31):
+            return True
         if is_cache_applicable(date_obj, today):
-            return fetch_rain_data_cached(date_obj, auth_key, time_start, time_end)
-        else:
-            return fetch_rain_data_raw(date_obj, auth_key, time_start, time_end)
-    except Exception as e:
-        # 캐시 실패 예외 발생 시 캐시 무시하고 재시도
-        st.warning(f"{date_obj} 캐시 오류 발생: {e}. 캐시 무시 후 재시도합니다.")
-        return fetch_rain_data_raw(date_obj, auth_key, time_start, time_end)
+            return time.monotonic() - self.fetched_at < Config.CACHE_TTL
+        # 오늘은 다음 분이 될 때까지만 최신 (같은 분 안의 반복 조회는 재조회하지 않음)
+        return int(time.time() // 60) == self.fetched_minute
+
+
+# (관측소, 날짜) -> 하루치 분 단위 인덱스(마지막 성공 응답). 만료돼도 stale 데이터로 제공
+# DataFrame 대신 MinuteIndex 만 보관하므로 지난 날짜도 LRU 로 오래 유지
+class FrameCache:
+    def __init__(self, max_days: int = Config.FRAME_CACHE_DAYS):
+        self.max_days = max_days
+        self._lock = threading.Lock()
+        self._frames: OrderedDict[tuple[str, date], CachedFrame] = OrderedDict()
+        self._inflight = {}
+        self._executor = ThreadPoolExecutor(max_workers=Config.REFRESH_THREADS, thread_name_prefix="rain-refresh")
+
+    def get(self, stn: str, date_obj: date) -> CachedFrame | None:
+        with self._lock:
+            entry = self._frames.get((stn, date_obj))
+            if entry is not None:
+                self._frames.move_to_end((stn, date_obj))
+            return entry
+
+    def put(self, stn: str, date_obj: date, entry: CachedFrame):
+        with self._lock:
+            self._store((stn, date_obj), entry)
+
+    def _store(self, key, entry: CachedFrame):
+        # 잠금 안에서 호출. 가장 오래 쓰지 않은 날짜부터 제거
+        self._frames[key] = entry
+        self._frames.move_to_end(key)
+        while len(self._frames) > self.max_days:
+            self._frames.popitem(last=False)
+
+    def refill(self, stn: str, date_obj: date, auth_key: str, time_start: str, time_end: str, settled_end: int):
+        # 같은 날짜의 누락 분 재조회는 하나만 실행 (동시 세션은 같은 결과를 기다림)
+        key = (stn, date_obj, "gaps")
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._refill, key, auth_key, time_start, time_end, settled_end)
+                self._inflight[key] = future
+        return future
+
+    def _refill(self, key, auth_key: str, time_start: str, time_end: str, settled_end: int):
+        # 빠진 분 구간만 다시 받아 기존 데이터에 병합
+        stn, date_obj, _ = key
+        try:
+            entry = self.get(stn, date_obj)
+            if entry is None:
+                return None
+            ranges = entry.due_gap_ranges(time_start, time_end)
+            if len(ranges) > Config.MAX_GAP_REQUESTS:
+                ranges = [(ranges[0][0], ranges[-1][1])]
+
+            parts = []
+            requested = np.zeros(MINUTES_PER_DAY, dtype=bool)
+            for gap_start, gap_end in ranges:
+                df = fetch_rain_data_raw(date_obj, auth_key, gap_start, gap_end)
+                if df is None:
+                    continue
+                # 응답은 받았는데 빠진 분만 재시도 횟수에 포함 (요청 실패는 제외)
+                lo, hi = hhmm_to_minute(gap_start), min(hhmm_to_minute(gap_end), settled_end)
+                if lo <= hi:
+                    requested[lo:hi + 1] = True
+                parts.append(MinuteIndex.from_frame(df))
+
+            with self._lock:
+                latest = self._frames.get((stn, date_obj), entry)
+                index = latest.index
+                for part in parts:
+                    index = index.merge(part)
+                retries = {m: v for m, v in latest.gap_retries.items() if not index.present[m]}
+                accepted = np.zeros(MINUTES_PER_DAY, dtype=bool)
+                now = time.monotonic()
+                for m in np.flatnonzero(requested & ~index.present).tolist():
+                    attempts, _, first_missing = retries.get(m, (0, 0.0, now))
+                    attempts += 1
+                    # 시도 횟수와 경과 시간(수 시간)을 모두 채워야 관측 없음으로 확정
+                    if attempts >= Config.MAX_GAP_ATTEMPTS and now - first_missing >= Config.GAP_ACCEPT_AFTER:
+                        accepted[m] = True
+                        retries.pop(m, None)
+                    else:
+                        backoff = min(Config.GAP_RETRY_BACKOFF * 2 ** (attempts - 1), Config.GAP_RETRY_MAX_BACKOFF)
+                        retries[m] = (attempts, now + backoff, first_missing)
+                if latest.gap_accepted is not None:
+                    accepted |= latest.gap_accepted
+                accepted = accepted if accepted.any() else None
+                filled = CachedFrame(
+                    latest.time_start, max(latest.time_end, time_end), _mark_accepted(index, accepted),
+                    latest.fetched_at, retries, accepted,
+                )
+                self._store((stn, date_obj), filled)
+            return filled
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def refresh(self, stn: str, date_obj: date, auth_key: str, time_start: str, time_end: str):
+        # 같은 날짜의 백그라운드 갱신은 하나만 실행
+        key = (stn, date_obj, time_start, time_end)
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._executor.submit(self._refresh, key, auth_key)
+                self._inflight[key] = future
+        return future
+
+    def _refresh(self, key, auth_key: str):
+        stn, date_obj, time_start, time_end = key
+        try:
+            df = fetch_rain_data_raw(date_obj, auth_key, time_start, time_end)
+            if df is None:
+                return None
+            # 관측 없음으로 확정한 분과 재시도 대기 상태는 전체 갱신 후에도 유지
+            old = self.get(stn, date_obj)
+            index = MinuteIndex.from_frame(df)
+            if old is None:
+                entry = CachedFrame(time_start, time_end, index)
+            else:
+                retries = {m: v for m, v in old.gap_retries.items() if not index.present[m]}
+                entry = CachedFrame(time_start, time_end, _mark_accepted(index, old.gap_accepted), None, retries, old.gap_accepted)
+            self.put(stn, date_obj, entry)
+            return entry
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+
+@st.cache_resource(show_spinner=False)
+def get_frame_cache() -> FrameCache:
+    return FrameCache()
+
+def fetch_rain_data(date_obj: date, auth_key: str, time_start=Config.DAY_START, time_end=Config.DAY_END, deadline: float | None = None, allow_trailing_gap: bool = False, window: tuple[str, str] | None = None) -> tuple[MinuteIndex | None, bool]:
+    cache = get_frame_cache()
+    stn = Config.STATION_CODE
+    entry = cache.get(stn, date_obj)
+
+    if entry is None:
+        timeout = remaining_timeout(deadline)
+        if timeout <= 0:
+            return None, False
+        df = fetch_rain_data_raw(date_obj, auth_key, time_start, time_end, timeout=timeout, hedge=True)
+        if df is None:
+            return None, False
+        entry = CachedFrame(time_start, time_end, MinuteIndex.from_frame(df))
+        cache.put(stn, date_obj, entry)
+        return entry.index, False
+
+    if entry.missing_ranges(time_start, time_end):
+        # 누락 분(지연 수신, 중간에 끊긴 조회, 오늘 새로 지난 분)만 백그라운드로 부분 재조회.
+        # 기존 데이터로 판정할 시간창(window)을 판정할 수 있으면 SWR 과 같이 잠깐만 기다리고,
+        # 판정할 수 없으면 조회 예산 안에서 재조회 결과를 기다림. 채우지 못한 누락이 남으면 stale
+        if entry.due_gap_ranges(time_start, time_end):
+            settled_end = hhmm_to_minute(time_end) - Config.GAP_SETTLE_MINUTES if allow_trailing_gap else MINUTES_PER_DAY - 1
+            future = cache.refill(stn, date_obj, auth_key, time_start, time_end, settled_end)
+            wait_for = remaining_timeout(deadline)
+            if entry.decides(*(window or (time_start, time_end)), allow_trailing_gap):
+                wait_for = min(Config.SWR_GRACE, wait_for)
+            try:
+                entry = future.result(timeout=max(0, wait_for)) or entry
+            except FutureTimeoutError:
+                pass
+        return entry.index, entry.has_unfilled_gaps(time_start, time_end, allow_trailing_gap)
+
+    if entry.is_fresh(date_obj):
+        return entry.index, False
+
+    # stale-while-revalidate: 백그라운드 갱신을 걸고 잠깐만 기다린 뒤 stale 데이터 반환
+    future = cache.refresh(stn, date_obj, auth_key, time_start, time_end)
+    try:
+        refreshed = future.result(timeout=max(0, min(Config.SWR_GRACE, remaining_timeout(deadline))))
+        if refreshed is not None:
+            return refreshed.index, False
+    except FutureTimeoutError:
+        pass
+    return entry.index, True
 
-def fetch_rain_data_raw(date_obj: date, auth_key: str, time_start="1000", time_end="1600"):
+def fetch_rain_data_raw(date_obj: date, auth_key: str, time_start=Config.DAY_START, time_end=Config.DAY_END, timeout: float = Config.REQUEST_TIMEOUT, hedge: bool = False):
     url = make_api_url(date_obj, auth_key, time_start, time_end)
     try:
-        r = requests.get(url, timeout=20)
+        # 사용자 조회 경로는 느린 응답에 중복 요청(헤징)으로 꼬리 지연 단축
+        r = get_hedger().get(url, timeout) if hedge else requests.get(url, timeout=timeout)
         r.raise_for_status()
         df = pd.read_csv(StringIO(r.text), sep=r'\s+', comment='#', header=None, names=COL_NAMES, dtype=str, encoding='euc-kr')
         df['RE'] = pd.to_numeric(df['RE'], errors='coerce').fillna(0)
@@ -1,19 +1,15 @@
+import time
 import streamlit as st
 from datetime import date, datetime, timedelta
-import holidays
-import pytz
-from ui import generate_rainy_calendar_html
-from logic import is_business_day, get_time_range_for_today, get_seoul_today, daterange, check_bipo_status, process_dates_with_threadpool
-from api import fetch_rain_data
 from auth import get_auth_key, test_auth_key, save_auth_key, is_admin
 from config import Config
-import streamlit.components.v1 as components
-from time_ridibooks import get_ridibooks_server_time, RidiTimeCounter
-from ui_jason import render_rain_data_tab
+from profiling import profile_rerun
 
-st.set_page_config(page_title="☔ 비포", layout="centered")
+# pandas, holidays, altair 등 무거운 모듈은 인증 화면 이후 필요한 경로에서만 불러옴
 
 def run_app():
+    st.set_page_config(page_title="☔ 비포", layout="centered")
+
     # 세션 상태 초기화
     if "retry_auth" not in st.session_state:
         st.session_state.retry_auth = False
@@ -96,6 +92,7 @@ def run_app():
     if not (st.session_state.get("auth_ok") or st.session_state.get("admin_authenticated")):
         st.stop()
 
+    import pytz
     now = datetime.now(pytz.timezone("Asia/Seoul"))
     one_min_ago = now - timedelta(minutes=1)
     formatted_now = f"{one_min_ago.strftime('%Y-%m-%d')} | {one_min_ago.strftime('%H:%M')} | 서울"
@@ -106,6 +103,9 @@ def run_app():
 
         if view_option == "Today":
             if st.button("조회"):
+                import holidays
+                from logic import is_business_day, get_time_range_for_today, get_seoul_today, resolve_day_status, get_hourly_rain_counts
+
                 today = get_seoul_today()
                 kr_holidays = holidays.KR(years=[today.year])
 
@@ -121,12 +121,19 @@ def run_app():
                         time_start, time_end = get_time_range_for_today(today)
                         st.write(f"비포 시간범위: {time_start} ~ {time_end}")
                         
-                        df = fetch_rain_data(today, auth_key, time_start, time_end)
-                        status, rain_times = check_bipo_status(today, df, kr_holidays, time_end)
+                        deadline = time.monotonic() + Config.QUERY_BUDGET
+                        (status, rain_times), stale = resolve_day_status(today, auth_key, kr_holidays, deadline)
+                        if stale:
+                            st.caption("⏳ API 응답 지연으로 이전 조회 결과를 표시합니다. 백그라운드에서 갱신 중입니다.")
 
                         if status == "rain_detected":
                             st.success("💧 오늘은 비포 받는 날!")
 
+                            with st.expander("🕐 시간대별 비 온 시간 보기"):
+                                hourly = get_hourly_rain_counts(today, auth_key, time_start, time_end, deadline)
+                                for hour, minutes in hourly.items():
+                                    st.write(f"{hour:02d}시 | {minutes}분")
+
                             with st.expander("📍 비가 온 시간 목록 보기"):
                                 for t in rain_times:
                                     st.write(f"💧 {today.strftime('%Y-%m-%d')} | {t}")
@@ -154,6 +161,10 @@ def run_app():
                     st.error("종료 날짜는 오늘 날짜를 넘을 수 없습니다.")
                 else:
                     with st.spinner("조회 중입니다... 잠시만 기다려주세요."):
+                        import holidays
+                        from logic import is_business_day, daterange, process_dates_with_threadpool
+                        from ui import render_rainy_calendar
+
                         dates = list(daterange(start_date, end_date))
                         kr_holidays = holidays.KR(years=list(range(start_date.year, end_date.year + 1)))
                         now_time = datetime.now(pytz.timezone("Asia/Seoul")).time()
@@ -168,13 +179,15 @@ def run_app():
 
                         rain_days = result_by_status.get("rain_detected", [])
                         fail_days = result_by_status.get("fail", [])
+                        stale_days = result_by_status.get("stale", [])
 
                         st.write(f"조회 기준시간: {formatted_now}")
                         st.write(f"💧 비포 있는 날: {len(rain_days)}일")
                         st.write(f"⚠️ API 조회 실패: {len(fail_days)}일")
+                        if stale_days:
+                            st.write(f"⏳ 이전 조회 결과 표시(갱신 중): {len(stale_days)}일")
 
-                        html_content = generate_rainy_calendar_html(start_date, end_date, result_by_status)
-                        st.components.v1.html(html_content, height=600, scrolling=True)
+                        render_rainy_calendar(start_date, end_date, result_by_status)
 
     with tabs[1]:
         st.title("📓 앱 소개")
@@ -232,18 +245,22 @@ def run_app():
                 """
                 1. **오늘의 비포**
                    - Today: 10:00 ~ 현재 시각(분-1) 구간의 비포 여부 조회
+                     - 비가 온 경우 시간대별 비 온 시간(분) 표시
                    - Month: 선택 기간 동안 비포를 캘린더 형식으로 조회
                      - 조회 종료일은 오늘로 기본 설정
                      - 오늘은 10:00 ~ 현재 시각(분-1) 실시간 반영
-                     - 최근 31일 이내면 2번째 조회부터 캐시 사용으로 조회 속도 향상
+                     - 한 번 조회한 날짜는 2번째 조회부터 캐시 사용으로 조회 속도 향상
+                     - 16:00이 지난 날짜는 결과가 확정 저장되어 API 조회 없이 표시 (2020-01-01 ~ 2025-07-04 아카이브 포함)
                      - API 조회 실패한 날은 여러 번 재시도 하면 조회됨, 차후 성공 시 캐시에 저장
-                     - 캐시 데이터는 6시간 동안 유효
+                     - 최근 31일 캐시 데이터는 6시간 동안 유효 (그 이전 날짜는 재조회하지 않음)
+                     - API 응답이 느리면 이전 조회 결과를 먼저 보여주고(점선 표시) 백그라운드에서 갱신
                    - 색상 표시
                      > 초록: 오늘 비 옴  
                      > 빨강: 오늘 비 안 옴  
                      > 파랑: 과거 비 내린 날  
                      > 옅은 회색: 조회 기간 외  
-                     > 진한 회색: API 조회 실패
+                     > 진한 회색: API 조회 실패  
+                     > 점선 테두리: 이전 조회 결과(갱신 중)
     
                 2. **About**
                    - 비/눈 포인트 조건 및 앱 이용 방법 안내
@@ -306,6 +323,8 @@ def run_app():
     
     
     with tabs[2]:
+        from time_ridibooks import get_ridibooks_server_time, RidiTimeCounter
+
         st.title(" ⏰ Ridi 서버시간")
         st.info("🔗 Ridi | https://ridibooks.com/ebook/recommendation")
 
@@ -316,7 +335,7 @@ def run_app():
         base_time = st.session_state.ridi_time_counter.now().strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
         st.write(f"🕰️새로고침 기준시간: `{base_time}`")
         
-        components.html(f"""
+        st.components.v1.html(f"""
             <div style="display: flex; flex-direction: column; align-items: center; justify-content: center; height: 150px;">
                 <div id="date" style="font-size:18px; color: #555;"></div>
                 <div id="clock" style="font-size:48px; font-weight:bold; margin-top: 5px;"></div>
@@ -357,6 +376,8 @@ def run_app():
             st.session_state.ridi_time_counter = RidiTimeCounter(st.session_state.ridi_server_time)        
 
     with tabs[3]:
+        from ui_jason import render_rain_data_tab
+
         render_rain_data_tab()
 
 
@@ -368,8 +389,14 @@ def run_app():
         if admin_input:
             if admin_input == ADMIN_PASSWORD:
                 st.success("⚜️ 관리자 인증 성공!")
+                from profiling import render_profile_admin
+                from hedge import render_hedge_metrics
+
+                render_profile_admin()
+                render_hedge_metrics()
             else:
                 st.error("비밀번호가 틀렸습니다.")
                 
 if __name__ == "__main__":
-    run_app()
+    with profile_rerun():
+        run_app()
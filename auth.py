@@ -2,7 +2,6 @@ import requests
 from datetime import date
 import streamlit as st
 from streamlit_js_eval import streamlit_js_eval
-from api import make_api_url
 from config import Config
 
 def load_auth_key_once(retry=False) -> str | None:
@@ -25,6 +24,9 @@ def save_auth_key(key: str):
     )
 
 def test_auth_key(auth_key: str) -> bool:
+    # api 모듈은 pandas 를 불러오므로 인증 화면 표시 전에는 import 하지 않음
+    from api import make_api_url
+
     today = date.today()
     url = make_api_url(today, auth_key, Config.TIME_START, Config.TIME_START)
     try:
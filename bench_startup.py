@@ -0,0 +1,97 @@
+"""콜드 스타트 벤치마크.
+
+매번 새 인터프리터에서 (1) app 모듈 import 시간과 (2) 인증 화면이 그려지기까지의
+첫 실행 시간을 재고, 그 시점까지 불러온 무거운 모듈을 출력한다.
+
+    python bench_startup.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_FILE = os.path.join(BASE_DIR, "app.py")
+HEAVY_MODULES = ("pandas", "numpy", "altair", "holidays", "pytz", "pyarrow")
+
+
+def loaded_heavy() -> list[str]:
+    return [m for m in HEAVY_MODULES if m in sys.modules]
+
+
+def child_import() -> dict:
+    # streamlit 자체는 서버가 이미 띄워둔 상태이므로 측정에서 제외
+    import streamlit  # noqa: F401
+
+    sys.path.insert(0, BASE_DIR)
+    before = set(loaded_heavy())
+    t0 = time.perf_counter()
+    import app  # noqa: F401
+    elapsed = time.perf_counter() - t0
+    return {"seconds": elapsed, "heavy": [m for m in loaded_heavy() if m not in before]}
+
+
+def child_paint() -> dict:
+    from streamlit.testing.v1 import AppTest
+
+    before = set(loaded_heavy())
+    at = AppTest.from_file(APP_FILE, default_timeout=60)
+    at.secrets["admin_token"] = "bench-admin"
+    t0 = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - t0
+    auth_form = any(t.label == "🔑 API 인증키 입력" for t in at.text_input)
+    return {
+        "seconds": elapsed,
+        "heavy": [m for m in loaded_heavy() if m not in before],
+        "auth_form": auth_form,
+        "exception": at.exception[0].message if at.exception else None,
+    }
+
+
+def run_child(kind: str) -> dict:
+    out = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", kind],
+        cwd=BASE_DIR, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def summarize(label: str, samples: list[dict]) -> str:
+    secs = [s["seconds"] for s in samples]
+    heavy = sorted({m for s in samples for m in s["heavy"]})
+    return (
+        f"{label:<12} median {statistics.median(secs) * 1000:8.1f} ms"
+        f"  min {min(secs) * 1000:8.1f} ms  max {max(secs) * 1000:8.1f} ms"
+        f"  heavy: {', '.join(heavy) or '-'}"
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="비포 앱 콜드 스타트 벤치마크")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    parser.add_argument("--child", choices=("import", "paint"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        result = child_import() if args.child == "import" else child_paint()
+        print(json.dumps(result))
+        return
+
+    results = {kind: [run_child(kind) for _ in range(args.runs)] for kind in ("import", "paint")}
+    print(summarize("import app", results["import"]))
+    print(summarize("auth paint", results["paint"]))
+    paint = results["paint"][-1]
+    if not paint["auth_form"]:
+        print(f"⚠️ 인증 화면이 그려지지 않았습니다: {paint['exception']}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,46 @@ BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 class Config:
     KEY_FILE = os.path.join(BASE_DIR, "secrets.txt")
     CACHE_DIR = "cache"
+    ARCHIVE_FILE = os.path.join(BASE_DIR, "rainy_json_save_20200101-20250704.json")
+    DAY_STATUS_FILE = os.path.join(BASE_DIR, CACHE_DIR, "day_status.jsonl")
+    API_BASE_URL = "https://apihub.kma.go.kr"
+    ARCHIVE_URL = "https://raw.githubusercontent.com/117g/rain_streamlit/main/rainy_json_save_20200101-20250704.json"
+    RIDI_URL = "https://ridibooks.com"
     STATION_CODE = "400"
+    DAY_START = "0000"
+    DAY_END = "2359"
     TIME_START = "1000"
     TIME_END = "1600"
     MAX_THREADS = 20
+    REQUEST_TIMEOUT = 20
+    QUERY_BUDGET = 25
+    CACHE_TTL = 21600
+    SWR_GRACE = 1.0
+    REFRESH_THREADS = 4
+    GAP_MERGE_MINUTES = 10
+    MAX_GAP_REQUESTS = 3
+    # 재조회 후에도 빠진 분: 대기(초, 시도마다 2배, 최대 1시간) 후 재시도.
+    # N회 이상 확인되고 처음 확인 후 GAP_ACCEPT_AFTER(초)가 지나야 관측 없음으로 채움 (확정 저장은 안 함)
+    MAX_GAP_ATTEMPTS = 3
+    GAP_RETRY_BACKOFF = 60
+    GAP_RETRY_MAX_BACKOFF = 3600
+    GAP_ACCEPT_AFTER = 21600
+    # 진행 중인 날은 이 시간(분)이 지난 분만 시도 횟수에 포함 (아직 수신 전인 최근 분 제외)
+    GAP_SETTLE_MINUTES = 10
+    MAX_MISSING_MINUTES = 0
+    # 메모리에 보관할 관측소·날짜별 분 단위 인덱스 수 (LRU)
+    FRAME_CACHE_DAYS = 2000
+    HEDGE_THREADS = 30
+    HEDGE_WINDOW = 200
+    HEDGE_MIN_SAMPLES = 20
+    HEDGE_PERCENTILE = 95
+    HEDGE_MIN_DELAY = 0.2
+    HEDGE_MAX_RATIO = 0.1
     TIME_START_OBJ = datetime.strptime(TIME_START, "%H%M").time()
     TIME_END_OBJ = datetime.strptime(TIME_END, "%H%M").time()
+    PROFILE_ENV = "RAIN_PROFILE"
+    PROFILE_RING_SIZE = 5
+    PROFILE_TRACEMALLOC_FRAMES = 10
+    # flamegraph 용 스택 샘플링 간격(초)과 최대 깊이
+    PROFILE_SAMPLE_INTERVAL = 0.005
+    PROFILE_MAX_DEPTH = 64
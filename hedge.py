@@ -0,0 +1,308 @@
+import heapq
+import itertools
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+import streamlit as st
+from config import Config
+
+# 호출 스레드에서 진행 중인 원 요청 (헤지가 먼저 성공하면 그 소켓을 끊어 호출 스레드를 깨움)
+_local = threading.local()
+
+
+def _percentile(values, pct: float) -> float | None:
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round((len(ordered) - 1) * pct / 100)))]
+
+
+# 요청 지연 분포(헤지 기준)와 헤지 실적 집계
+class HedgeMetrics:
+    def __init__(self, window: int = Config.HEDGE_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        # 단일 요청 지연 = 헤징이 없었을 때의 분포 (끝까지 완료된 원 요청만, 헤지 기준에도 사용)
+        self.primary_latencies = deque(maxlen=window)
+        # 헤지에 밀려 끊긴 원 요청이 그때까지 걸린 시간 (실제 지연의 하한값이므로 분포와 분리)
+        self.cut_primaries = deque(maxlen=window)
+        self.cuts = 0
+        # 사용자가 실제로 기다린 지연
+        self.effective_latencies = deque(maxlen=window)
+        # 헤지한 요청 번호 (최근 window 개 요청 안의 헤지 비율 계산용)
+        self.recent_hedges = deque(maxlen=window)
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def hedge_delay(self) -> float | None:
+        # 최근 p95 지연을 넘기면 중복 요청 (표본이 적으면 헤징하지 않음)
+        with self._lock:
+            if len(self.primary_latencies) < Config.HEDGE_MIN_SAMPLES:
+                return None
+            samples = list(self.primary_latencies)
+        return max(Config.HEDGE_MIN_DELAY, _percentile(samples, Config.HEDGE_PERCENTILE))
+
+    def count_request(self) -> int:
+        with self._lock:
+            self.requests += 1
+            return self.requests
+
+    def try_acquire_hedge(self, seq: int) -> bool:
+        # 최근 window 개 요청 대비 헤지 비율 상한 (조용하던 뒤의 폭주도 전부 헤징하지 않음)
+        with self._lock:
+            oldest = self.requests - self.window
+            while self.recent_hedges and self.recent_hedges[0] <= oldest:
+                self.recent_hedges.popleft()
+            if len(self.recent_hedges) + 1 > Config.HEDGE_MAX_RATIO * min(self.requests, self.window):
+                return False
+            self.recent_hedges.append(seq)
+            self.hedges += 1
+            return True
+
+    def record_primary(self, latency: float):
+        with self._lock:
+            self.primary_latencies.append(latency)
+
+    def record_cut(self, lower_bound: float):
+        with self._lock:
+            self.cut_primaries.append(lower_bound)
+            self.cuts += 1
+
+    def record_effective(self, latency: float, hedge_won: bool):
+        with self._lock:
+            self.effective_latencies.append(latency)
+            if hedge_won:
+                self.hedge_wins += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            primary = list(self.primary_latencies)
+            effective = list(self.effective_latencies)
+            cut = list(self.cut_primaries)
+            requests_, hedges, wins, cuts = self.requests, self.hedges, self.hedge_wins, self.cuts
+        return {
+            "requests": requests_,
+            "hedges": hedges,
+            "hedge_rate": hedges / requests_ if requests_ else 0.0,
+            "hedge_wins": wins,
+            # 끊긴 원 요청 수와 그 하한값 (최근 window 기준 최소/중앙값: 모두 이 이상 걸렸을 요청)
+            "cut_primaries": cuts,
+            "cut_min": min(cut) if cut else None,
+            "cut_p50": _percentile(cut, 50),
+            "primary_p50": _percentile(primary, 50),
+            "primary_p95": _percentile(primary, 95),
+            "primary_p99": _percentile(primary, 99),
+            "effective_p50": _percentile(effective, 50),
+            "effective_p95": _percentile(effective, 95),
+            "effective_p99": _percentile(effective, 99),
+        }
+
+
+class _Attempt:
+    # 요청 1건의 원 요청/헤지 상태
+    def __init__(self, seq: int):
+        self.seq = seq
+        self._lock = threading.Lock()
+        self._sock = None
+        self.primary_done = False
+        self.aborted = False
+        self.hedge = None
+
+    def attach(self, sock):
+        with self._lock:
+            self._sock = sock
+            aborted = self.aborted
+        if aborted:
+            self._shutdown(sock)
+
+    def start_hedge(self, submit) -> bool:
+        with self._lock:
+            if self.primary_done:
+                return False
+            self.hedge = submit()
+            return True
+
+    def abort_primary(self) -> bool:
+        # 헤지가 먼저 성공: 원 요청이 아직 진행 중이면 소켓을 끊음
+        with self._lock:
+            if self.primary_done:
+                return False
+            self.aborted = True
+            sock = self._sock
+        if sock is not None:
+            self._shutdown(sock)
+        return True
+
+    def finish_primary(self):
+        with self._lock:
+            self.primary_done = True
+            return self.aborted, self.hedge
+
+    @staticmethod
+    def _shutdown(sock):
+        try:
+            sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+
+
+class _AbortableMixin:
+    def getresponse(self, *args, **kwargs):
+        attempt = getattr(_local, "attempt", None)
+        if attempt is not None and self.sock is not None:
+            attempt.attach(self.sock)
+        return super().getresponse(*args, **kwargs)
+
+
+class _AbortableHTTPConnection(_AbortableMixin, HTTPConnection):
+    pass
+
+
+class _AbortableHTTPSConnection(_AbortableMixin, HTTPSConnection):
+    pass
+
+
+class _AbortableHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _AbortableHTTPConnection
+
+
+class _AbortableHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _AbortableHTTPSConnection
+
+
+class _AbortableAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _AbortableHTTPPool, "https": _AbortableHTTPSPool}
+
+
+class _HedgeTimer:
+    # 헤지 시각이 된 요청만 풀에 넘기는 단일 타이머 스레드 (대기에 풀 스레드를 쓰지 않음)
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []
+        self._seq = itertools.count()
+        self._thread = threading.Thread(target=self._run, name="rain-hedge-timer", daemon=True)
+        self._thread.start()
+
+    def schedule(self, at: float, fn):
+        with self._cond:
+            heapq.heappush(self._heap, (at, next(self._seq), fn))
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap or self._heap[0][0] > time.monotonic():
+                    self._cond.wait(self._heap[0][0] - time.monotonic() if self._heap else None)
+                _, _, fn = heapq.heappop(self._heap)
+            try:
+                fn()
+            except Exception:
+                pass
+
+
+class Hedger:
+    def __init__(self):
+        self.metrics = HedgeMetrics()
+        # 원 요청은 호출 스레드에서 실행, 풀은 헤지 요청에만 사용
+        self._executor = ThreadPoolExecutor(max_workers=Config.HEDGE_THREADS, thread_name_prefix="rain-hedge")
+        self._timer = _HedgeTimer()
+        self._session = requests.Session()
+        adapter = _AbortableAdapter(pool_maxsize=Config.MAX_THREADS)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+    def _get(self, url: str, timeout: float) -> requests.Response:
+        r = self._session.get(url, timeout=timeout)
+        r.raise_for_status()
+        return r
+
+    def _maybe_hedge(self, url: str, deadline: float, attempt: _Attempt):
+        # 타이머 스레드에서 호출: 원 요청이 아직 진행 중이면 비율 상한 안에서 중복 요청
+        if attempt.primary_done or not self.metrics.try_acquire_hedge(attempt.seq):
+            return
+        attempt.start_hedge(lambda: self._executor.submit(self._hedge_get, url, deadline, attempt))
+
+    def _hedge_get(self, url: str, deadline: float, attempt: _Attempt) -> requests.Response:
+        r = self._get(url, max(0.1, deadline - time.monotonic()))
+        attempt.abort_primary()
+        return r
+
+    def get(self, url: str, timeout: float) -> requests.Response:
+        t0 = time.monotonic()
+        deadline = t0 + timeout
+        attempt = _Attempt(self.metrics.count_request())
+
+        # 헤지 지연은 원 요청이 실제로 시작된 시각부터 계산
+        delay = self.metrics.hedge_delay()
+        if delay is not None and delay < timeout:
+            self._timer.schedule(t0 + delay, lambda: self._maybe_hedge(url, deadline, attempt))
+
+        error = None
+        _local.attempt = attempt
+        try:
+            r = self._get(url, timeout)
+        except Exception as e:
+            error = e
+        finally:
+            _local.attempt = None
+        elapsed = time.monotonic() - t0
+        aborted, hedge = attempt.finish_primary()
+
+        if error is None and not aborted:
+            self.metrics.record_primary(elapsed)
+            self.metrics.record_effective(elapsed, False)
+            if hedge is not None:
+                hedge.cancel()
+            return r
+        if aborted:
+            # 끊긴 원 요청의 경과 시간은 실제 지연이 아니므로 분포·헤지 기준에 넣지 않고 따로 집계
+            self.metrics.record_cut(elapsed)
+        if hedge is None:
+            raise error
+        # 원 요청이 실패했거나 헤지에 밀려 끊김: 헤지 결과 사용
+        try:
+            r = hedge.result(timeout=max(0, deadline - time.monotonic()))
+        except Exception as e:
+            raise error or e
+        self.metrics.record_effective(time.monotonic() - t0, True)
+        return r
+
+
+@st.cache_resource(show_spinner=False)
+def get_hedger() -> Hedger:
+    return Hedger()
+
+
+def render_hedge_metrics():
+    st.subheader("📈 요청 헤징")
+    st.caption(
+        f"응답이 최근 p{Config.HEDGE_PERCENTILE} 지연을 넘기면 중복 요청 1회 "
+        f"(최근 {Config.HEDGE_WINDOW}개 요청의 최대 {Config.HEDGE_MAX_RATIO:.0%})"
+    )
+    m = get_hedger().metrics.snapshot()
+
+    def fmt(seconds):
+        return "-" if seconds is None else f"{seconds:.2f}s"
+
+    cols = st.columns(3)
+    cols[0].metric("요청", m["requests"])
+    cols[1].metric("헤지 비율", f"{m['hedge_rate']:.1%}", f"{m['hedges']}회")
+    cols[2].metric("헤지 승리", m["hedge_wins"], f"헤지 중 {m['hedge_wins'] / m['hedges']:.0%}" if m["hedges"] else None)
+    cols = st.columns(3)
+    for col, pct in zip(cols, (50, 95, 99)):
+        col.metric(f"p{pct} 지연", fmt(m[f"effective_p{pct}"]), f"단일 요청 {fmt(m[f'primary_p{pct}'])}", delta_color="off")
+    # 단일 요청 분위수는 끝까지 완료된 원 요청 기준. 헤지에 밀려 끊긴 요청은 실제 지연을 알 수 없어 하한만 표시
+    if m["cut_primaries"]:
+        st.caption(
+            f"헤지로 끊은 원 요청 {m['cut_primaries']}건: 모두 {fmt(m['cut_min'])} 이상 소요 "
+            f"(중앙값 하한 {fmt(m['cut_p50'])}), 위 단일 요청 분위수에는 포함되지 않음"
+        )
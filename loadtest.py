@@ -0,0 +1,420 @@
+"""동시 세션 부하 테스트.
+
+로컬 KMA 대역 서버(지연 설정 가능)를 띄우고, N개 세션이 Today/Month/Statics 조회를
+섞어 실행하면서 처리량, p50/p95/p99 지연, 최대 스레드 수, RSS 를 N별로 출력한다.
+조회 예산(QUERY_BUDGET)을 넘겨 버려진 조회 워커가 세션 종료 시점에 몇 개 남았는지(leftover)와
+모두 끝나기까지 걸린 시간(drain)도 함께 출력한다.
+
+    python loadtest.py --sessions 1,5,10,20 --iterations 5 --latency-ms 300
+    python loadtest.py --mode headless --sessions 50,100 --mix today=0.3,month=0.6,statics=0.1
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from config import BASE_DIR, Config
+
+APP_FILE = os.path.join(BASE_DIR, "app.py")
+SCENARIOS = ("today", "month", "statics")
+
+
+# ---------------------------------------------------------------------------
+# KMA / Ridi / GitHub 대역 서버
+# ---------------------------------------------------------------------------
+
+class StandInHandler(BaseHTTPRequestHandler):
+    latency_ms = 200.0
+    jitter_ms = 100.0
+    slow_rate = 0.0
+    slow_ms = 5000.0
+    fail_rate = 0.0
+    gap_rate = 0.0
+    rain_rate = 0.05
+    archive_bytes = b"{}"
+    request_count = 0
+    _count_lock = threading.Lock()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _delay(self):
+        with self._count_lock:
+            StandInHandler.request_count += 1
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if random.random() < self.slow_rate:
+            delay = self.slow_ms
+        time.sleep(max(0.0, delay) / 1000)
+
+    def do_HEAD(self):
+        # Ridi 서버시간 조회용 Date 헤더 (send_response 는 Date 를 중복 추가하므로 사용하지 않음)
+        self.send_response_only(200)
+        self.send_header("Date", formatdate(usegmt=True))
+        self.end_headers()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.endswith(".json"):
+            self._send(200, self.archive_bytes, "application/json")
+            return
+        if not url.path.endswith("nph-aws2_min"):
+            self._send(404, b"not found")
+            return
+
+        self._delay()
+        if random.random() < self.fail_rate:
+            self._send(503, b"unavailable")
+            return
+        query = parse_qs(url.query)
+        body = self.minute_rows(query["tm1"][0], query["tm2"][0], query.get("stn", [Config.STATION_CODE])[0])
+        self._send(200, body.encode("euc-kr"))
+
+    def minute_rows(self, tm1: str, tm2: str, stn: str) -> str:
+        start = datetime.strptime(tm1, "%Y%m%d%H%M")
+        end = datetime.strptime(tm2, "%Y%m%d%H%M")
+        # 날짜별로 고정된 강수 패턴 (재조회해도 같은 결과)
+        rng = random.Random(tm1[:8])
+        rainy_day = rng.random() < self.rain_rate * 10
+        lines = ["# YYMMDDHHMI STN WD1 WS1 WDS WSS WD10 WS10 TA RE RN-15m RN-60m RN-12H RN-DAY HM PA PS TD"]
+        t = start
+        while t <= end:
+            re = 1 if rainy_day and rng.random() < self.rain_rate else 0
+            # 지연 수신 흉내: 일부 분 누락 (부분 재조회 경로 확인용)
+            if random.random() < self.gap_rate:
+                t += timedelta(minutes=1)
+                continue
+            lines.append(f"{t:%Y%m%d%H%M} {stn} 0 0.0 0 0.0 0 0.0 10.0 {re} 0.0 0.0 0.0 0.0 50.0 1010.0 1015.0 0.0")
+            t += timedelta(minutes=1)
+        return "\n".join(lines) + "\n"
+
+    def _send(self, code: int, body: bytes, content_type: str = "text/plain"):
+        try:
+            self.send_response(code)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            # 헤지가 먼저 성공해 클라이언트가 원 요청을 끊은 경우
+            self.close_connection = True
+
+
+def start_stand_in(args) -> ThreadingHTTPServer:
+    StandInHandler.latency_ms = args.latency_ms
+    StandInHandler.jitter_ms = args.jitter_ms
+    StandInHandler.slow_rate = args.slow_rate
+    StandInHandler.slow_ms = args.slow_ms
+    StandInHandler.fail_rate = args.fail_rate
+    StandInHandler.gap_rate = args.gap_rate
+    with open(Config.ARCHIVE_FILE, "rb") as f:
+        StandInHandler.archive_bytes = f.read()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StandInHandler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="kma-stand-in", daemon=True).start()
+    return server
+
+
+# ---------------------------------------------------------------------------
+# 세션 시나리오
+# ---------------------------------------------------------------------------
+
+def random_month_range(rng: random.Random, today: date) -> tuple[date, date]:
+    end = today - timedelta(days=rng.randint(0, 30))
+    start = end - timedelta(days=rng.randint(0, 30))
+    return start, end
+
+
+class HeadlessSession:
+    # Streamlit 없이 app.run_app 이 부르는 조회 경로를 그대로 호출
+    def __init__(self, auth_key: str):
+        self.auth_key = auth_key
+
+    def run(self, scenario: str, rng: random.Random):
+        import holidays
+        from logic import daterange, get_seoul_today, is_business_day, process_dates_with_threadpool, resolve_day_status
+
+        today = get_seoul_today()
+        if scenario == "today":
+            kr_holidays = holidays.KR(years=[today.year])
+            resolve_day_status(today, self.auth_key, kr_holidays, time.monotonic() + Config.QUERY_BUDGET)
+        elif scenario == "month":
+            start, end = random_month_range(rng, today)
+            kr_holidays = holidays.KR(years=list(range(start.year, end.year + 1)))
+            dates = [d for d in daterange(start, end) if is_business_day(d, kr_holidays)]
+            process_dates_with_threadpool(dates, self.auth_key, kr_holidays)
+        else:
+            from ui_jason import load_rain_data, preprocess_data
+            preprocess_data(load_rain_data().get("rain_minutes_by_date", {}))
+
+
+class AppTestSession:
+    # streamlit.testing 의 AppTest 로 app.run_app 전체 재실행
+    def __init__(self, auth_key: str, timeout: float):
+        from streamlit.testing.v1 import AppTest
+
+        self.timeout = timeout
+        self.at = AppTest.from_file(APP_FILE, default_timeout=timeout)
+        self.at.secrets["admin_token"] = "loadtest-admin"
+        self.at.secrets["API_KEY"] = auth_key
+        self.at.session_state["auth_key"] = auth_key
+        self.at.session_state["auth_ok"] = True
+        self.at.run()
+
+    def _button(self, label: str):
+        return next(b for b in self.at.button if b.label == label)
+
+    def run(self, scenario: str, rng: random.Random):
+        from logic import get_seoul_today
+
+        if scenario == "today":
+            self.at.radio[0].set_value("Today").run()
+            self._button("조회").click().run()
+        elif scenario == "month":
+            self.at.radio[0].set_value("Month").run()
+            start, end = random_month_range(rng, get_seoul_today())
+            self.at.date_input[0].set_value(start)
+            self.at.date_input[1].set_value(end)
+            self._button("조회 시작").click().run()
+        else:
+            # Statics 탭은 매 재실행마다 렌더링되므로 일반 재실행으로 측정
+            self.at.run()
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+
+# ---------------------------------------------------------------------------
+# 측정
+# ---------------------------------------------------------------------------
+
+def current_rss_kb() -> int:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    # /proc 이 없는 환경은 최대 RSS 로 대체 (macOS 는 byte 단위)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+class ResourceSampler:
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak_threads = 0
+        self.peak_rss_kb = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, name="loadtest-sampler", daemon=True)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self.peak_threads = max(self.peak_threads, threading.active_count())
+            self.peak_rss_kb = max(self.peak_rss_kb, current_rss_kb())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def parse_mix(text: str) -> dict[str, float]:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise argparse.ArgumentTypeError(f"알 수 없는 시나리오: {name}")
+        mix[name] = float(weight)
+    return mix
+
+
+def reset_process_caches():
+    import streamlit as st
+
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    # 확정 저장소도 아카이브 시드 상태로 되돌림
+    if os.path.exists(Config.DAY_STATUS_FILE):
+        os.remove(Config.DAY_STATUS_FILE)
+
+
+def query_threads() -> int:
+    from logic import QUERY_THREAD_PREFIX
+
+    return sum(t.name.startswith(QUERY_THREAD_PREFIX) for t in threading.enumerate())
+
+
+def drain_query_threads(timeout: float) -> float:
+    # 버려진 조회 워커가 모두 끝날 때까지 대기 (다음 단계로 누적되지 않도록)
+    t0 = time.perf_counter()
+    while query_threads() and time.perf_counter() - t0 < timeout:
+        time.sleep(0.05)
+    return time.perf_counter() - t0
+
+
+def run_level(n_sessions: int, args, mix: dict[str, float]) -> dict:
+    if not args.warm:
+        reset_process_caches()
+
+    names, weights = list(mix), list(mix.values())
+    latencies = {name: [] for name in SCENARIOS}
+    errors = []
+    lock = threading.Lock()
+    start_barrier = threading.Barrier(n_sessions + 1)
+
+    def session_main(idx: int):
+        rng = random.Random(args.seed * 1000 + idx)
+        try:
+            if args.mode == "apptest":
+                session = AppTestSession(args.auth_key, args.timeout)
+            else:
+                session = HeadlessSession(args.auth_key)
+        except Exception as e:
+            with lock:
+                errors.append(f"session {idx} init: {e}")
+            start_barrier.wait()
+            return
+        start_barrier.wait()
+        for _ in range(args.iterations):
+            scenario = rng.choices(names, weights)[0]
+            t0 = time.perf_counter()
+            try:
+                session.run(scenario, rng)
+            except Exception as e:
+                with lock:
+                    errors.append(f"{scenario}: {e}")
+                continue
+            elapsed = time.perf_counter() - t0
+            with lock:
+                latencies[scenario].append(elapsed)
+
+    workers = [threading.Thread(target=session_main, args=(i,), name=f"loadtest-session-{i}") for i in range(n_sessions)]
+    upstream_before = StandInHandler.request_count
+    with ResourceSampler() as sampler:
+        for w in workers:
+            w.start()
+        start_barrier.wait()
+        t0 = time.perf_counter()
+        for w in workers:
+            w.join()
+        wall = time.perf_counter() - t0
+        leftover = query_threads()
+        drain = drain_query_threads(Config.REQUEST_TIMEOUT + Config.QUERY_BUDGET) if leftover else 0.0
+
+    from hedge import get_hedger
+    hedge = get_hedger().metrics.snapshot()
+    all_latencies = [v for values in latencies.values() for v in values]
+    return {
+        "sessions": n_sessions,
+        "ops": len(all_latencies),
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "wall_s": wall,
+        "throughput": len(all_latencies) / wall if wall else 0.0,
+        "p50": percentile(all_latencies, 50),
+        "p95": percentile(all_latencies, 95),
+        "p99": percentile(all_latencies, 99),
+        "by_scenario": {name: {"ops": len(v), "p50": percentile(v, 50), "p95": percentile(v, 95)} for name, v in latencies.items() if v},
+        "upstream_requests": StandInHandler.request_count - upstream_before,
+        "hedge_rate": hedge["hedge_rate"],
+        "hedge_wins": hedge["hedge_wins"],
+        "peak_threads": sampler.peak_threads,
+        "peak_rss_mb": sampler.peak_rss_kb / 1024,
+        "leftover_threads": leftover,
+        "drain_s": drain,
+    }
+
+
+def format_table(rows: list[dict]) -> str:
+    header = f"{'N':>5} {'ops':>6} {'err':>5} {'ops/s':>8} {'p50(s)':>8} {'p95(s)':>8} {'p99(s)':>8} {'upstream':>9} {'hedge%':>7} {'threads':>8} {'RSS(MB)':>9} {'leftover':>9} {'drain(s)':>9}"
+    lines = [header, "-" * len(header)]
+    for r in rows:
+        lines.append(
+            f"{r['sessions']:>5} {r['ops']:>6} {r['errors']:>5} {r['throughput']:>8.2f} "
+            f"{r['p50']:>8.3f} {r['p95']:>8.3f} {r['p99']:>8.3f} {r['upstream_requests']:>9} "
+            f"{r['hedge_rate'] * 100:>7.1f} {r['peak_threads']:>8} {r['peak_rss_mb']:>9.1f} "
+            f"{r['leftover_threads']:>9} {r['drain_s']:>9.2f}"
+        )
+    return "\n".join(lines)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="비포 앱 동시 세션 부하 테스트")
+    parser.add_argument("--mode", choices=("apptest", "headless"), default="apptest")
+    parser.add_argument("--sessions", default="1,5,10,20", help="쉼표로 구분한 동시 세션 수 목록")
+    parser.add_argument("--iterations", type=int, default=5, help="세션당 조회 횟수")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("today=0.4,month=0.5,statics=0.1"))
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument("--jitter-ms", type=float, default=100.0)
+    parser.add_argument("--slow-rate", type=float, default=0.0, help="slow-ms 만큼 느린 응답 비율")
+    parser.add_argument("--slow-ms", type=float, default=5000.0)
+    parser.add_argument("--fail-rate", type=float, default=0.0)
+    parser.add_argument("--gap-rate", type=float, default=0.0, help="응답에서 누락시킬 분 비율")
+    parser.add_argument("--query-budget", type=float, default=Config.QUERY_BUDGET, help="조회 1회 예산(초)")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=120.0, help="AppTest 재실행 타임아웃(초)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--auth-key", default="loadtest-key")
+    parser.add_argument("--warm", action="store_true", help="단계 사이에 프로세스 캐시를 비우지 않음")
+    parser.add_argument("--json", help="결과를 JSON 파일로 저장")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = start_stand_in(args)
+    host, port = server.server_address[:2]
+
+    # 모든 외부 호출을 대역 서버로, 확정 저장소는 임시 파일로
+    cache_dir = tempfile.mkdtemp(prefix="rain-loadtest-")
+    Config.API_BASE_URL = f"http://{host}:{port}"
+    Config.ARCHIVE_URL = f"http://{host}:{port}/archive.json"
+    Config.RIDI_URL = f"http://{host}:{port}"
+    Config.DAY_STATUS_FILE = os.path.join(cache_dir, "day_status.jsonl")
+    Config.QUERY_BUDGET = args.query_budget
+
+    print(f"stand-in: {Config.API_BASE_URL} | mode={args.mode} | latency={args.latency_ms}±{args.jitter_ms}ms | mix={args.mix}")
+    rows = []
+    print(format_table([]), flush=True)
+    try:
+        for n in [int(x) for x in args.sessions.split(",") if x]:
+            row = run_level(n, args, args.mix)
+            rows.append(row)
+            print(format_table([row]).splitlines()[-1], flush=True)
+            for sample in row["error_samples"]:
+                print(f"      error: {sample}")
+    finally:
+        server.shutdown()
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"args": {k: v for k, v in vars(args).items()}, "results": rows}, f, ensure_ascii=False, indent=2, default=str)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,18 @@
 from datetime import date, datetime, timedelta
-from concurrent.futures import ThreadPoolExecutor
-import pandas as pd
+from concurrent.futures import ThreadPoolExecutor, wait
+import time
 import holidays
-from api import fetch_rain_data
+from api import fetch_rain_data, get_frame_cache
 from config import Config
+from store import get_day_status_store
+from profiling import current_run
+from minute_index import MinuteIndex
 import pytz
 import streamlit as st
 
+# 조회별 워커 스레드 이름 (loadtest.py 가 예산 초과 후 남은 워커를 셀 때 사용)
+QUERY_THREAD_PREFIX = "rain-query"
+
 def is_business_day(d: date, kr_holidays) -> bool:
     return d.weekday() < 5 and d not in kr_holidays and not (d.month == 5 and d.day == 1)
 
@@ -25,56 +31,130 @@ def get_time_range_for_today(date_obj: date) -> tuple[str, str]:
         return Config.TIME_START, Config.TIME_END
     return Config.TIME_START, (datetime.now(pytz.timezone("Asia/Seoul")) - timedelta(minutes=1)).strftime("%H%M")
 
+def get_fetch_range(date_obj: date) -> tuple[str, str]:
+    # 하루 전체를 한 번에 조회 (오늘은 현재 시각 1분 전까지)
+    last_minute = datetime.now(pytz.timezone("Asia/Seoul")) - timedelta(minutes=1)
+    if date_obj != get_seoul_today():
+        return Config.DAY_START, Config.DAY_END
+    if last_minute.date() != date_obj:
+        return Config.DAY_START, Config.DAY_START
+    return Config.DAY_START, last_minute.strftime("%H%M")
+
+def is_day_finalized(date_obj: date, time_end: str = Config.TIME_END) -> bool:
+    # 시간창이 완전히 닫힌 날만 확정 (오늘은 종료 시각 분이 지나야 확정)
+    now = datetime.now(pytz.timezone("Asia/Seoul"))
+    if date_obj < now.date():
+        return True
+    return date_obj == now.date() and now.strftime("%H%M") > time_end
+
 def daterange(start_date: date, end_date: date):
     current = start_date
     while current <= end_date:
         yield current
         current += timedelta(days=1)
 
-def check_bipo_status(date_obj: date, df: pd.DataFrame, kr_holidays, time_end: str) -> tuple[str, tuple[str, ...]]:
+def check_bipo_status(date_obj: date, index: MinuteIndex | None, kr_holidays, time_end: str, time_start: str = Config.TIME_START, allow_trailing_gap: bool = False) -> tuple[str, tuple[str, ...]]:
     if not is_business_day(date_obj, kr_holidays):
         return "pass", tuple()
 
-    if df is None or 'RE' not in df.columns:
+    if index is None:
         return "fail", tuple()
 
-    df = df.copy()
-    df['HHMM'] = df['YYMMDDHHMI'].str[-4:]
-    df['RE'] = pd.to_numeric(df['RE'], errors='coerce').fillna(0)
+    rain_times = index.rain_times(time_start, time_end)
+    if rain_times:
+        return "rain_detected", rain_times
 
-    mask = (df['HHMM'] >= Config.TIME_START) & (df['HHMM'] <= time_end) & (df['RE'] != 0)
-    rain_times = df.loc[mask, 'HHMM'].tolist()
-    rain_times_formatted = [f"{t[:2]}:{t[2:]}" for t in rain_times]
-
-    if rain_times_formatted:
-        return "rain_detected", tuple(rain_times_formatted)
+    # 진행 중인 시간창은 아직 수신되지 않았을 수 있는 마지막 분들만 누락으로 보지 않음
+    # (오래된 데이터의 긴 꼬리 누락까지 허용하면 몇 시간 전 결과로 "비 없음" 판정)
+    trailing_grace = Config.GAP_SETTLE_MINUTES if allow_trailing_gap else 0
+    # 빠진 분이 있으면 "비 없음"으로 확정하지 않음
+    if index.missing_count(time_start, time_end, trailing_grace) > Config.MAX_MISSING_MINUTES:
+        return "fail", tuple()
     return "no_rain", tuple()
 
+def get_hourly_rain_counts(date_obj: date, auth_key: str, time_start: str, time_end: str, deadline: float | None = None) -> dict[int, int]:
+    # resolve_day_status 가 받아 둔 하루치 인덱스를 그대로 사용 (캐시에 없을 때만 조회)
+    entry = get_frame_cache().get(Config.STATION_CODE, date_obj)
+    if entry is not None:
+        index = entry.index
+    else:
+        index, _ = fetch_rain_data(date_obj, auth_key, *get_fetch_range(date_obj), deadline=deadline, allow_trailing_gap=not is_day_finalized(date_obj))
+    if index is None:
+        return {}
+    return index.hourly_rain_counts(time_start, time_end)
+
+def resolve_day_status(date_obj: date, auth_key: str, kr_holidays, deadline: float | None = None) -> tuple[tuple[str, tuple[str, ...]], bool]:
+    store = get_day_status_store()
+    window = (Config.TIME_START, Config.TIME_END)
+    cached = store.get(Config.STATION_CODE, date_obj, window)
+    if cached is not None:
+        return cached, False
+
+    t_start, t_end = get_time_range_for_today(date_obj)
+    # 하루치 데이터를 받아 시간창은 로컬에서 판정
+    # (오늘의 t_end 는 "현재-1분"이므로 확정 여부는 항상 16:00 기준으로 판단)
+    finalized = is_day_finalized(date_obj)
+    index, stale = fetch_rain_data(date_obj, auth_key, *get_fetch_range(date_obj), deadline=deadline, allow_trailing_gap=not finalized, window=(t_start, t_end))
+    status = check_bipo_status(date_obj, index, kr_holidays, t_end, t_start, allow_trailing_gap=not finalized)
+
+    # 16:00 창이 닫히고 모든 분을 실제로 수신한 날만 저장
+    # (오늘 진행 중인 결과, stale 결과, 관측 없음으로 채운 분이 있는 결과는 저장하지 않음)
+    complete = index is None or index.synthesized_count(t_start, t_end) == 0
+    if not stale and complete and t_end == Config.TIME_END and finalized:
+        store.put(Config.STATION_CODE, date_obj, window, *status)
+    return status, stale
+
 def process_dates_with_threadpool(dates, auth_key, kr_holidays):
+    store = get_day_status_store()
+    window = (Config.TIME_START, Config.TIME_END)
+    deadline = time.monotonic() + Config.QUERY_BUDGET
     results = []
+    pending = []
+
+    # 확정된 날짜는 저장소 조회만으로 처리, 나머지(오늘·누락일)만 API 조회
+    for d in dates:
+        cached = store.get(Config.STATION_CODE, d, window)
+        if cached is None:
+            pending.append(d)
+        else:
+            results.append((d, cached, False))
 
     def worker(date_obj):
+        if time.monotonic() >= deadline:
+            return date_obj, ("fail", tuple()), False
         try:
-            t_start, t_end = get_time_range_for_today(date_obj)
-            df = fetch_rain_data(date_obj, auth_key, t_start, t_end)
-            status = check_bipo_status(date_obj, df, kr_holidays, t_end)  # <-- t_end 추가
-            return date_obj, status
+            status, stale = resolve_day_status(date_obj, auth_key, kr_holidays, deadline)
+            return date_obj, status, stale
         except Exception as e:
-            return date_obj, ("fail", tuple())
-
-
-    with ThreadPoolExecutor(max_workers=Config.MAX_THREADS) as executor:
-        results = list(executor.map(worker, dates))
+            return date_obj, ("fail", tuple()), False
+
+    # 프로파일링 중이면 워커 스레드도 호출 그래프에 포함
+    run = current_run()
+    task = run.wrap(worker) if run else worker
+
+    if pending:
+        executor = ThreadPoolExecutor(max_workers=min(Config.MAX_THREADS, len(pending)), thread_name_prefix=QUERY_THREAD_PREFIX)
+        futures = {executor.submit(task, d): d for d in pending}
+        done, not_done = wait(futures, timeout=max(0, deadline - time.monotonic()))
+        # 예산 초과 시 남은 날짜는 기다리지 않고 실패 처리(모두 끝났으면 유휴 스레드까지 정리). 대기 중인 작업은 취소되고,
+        # 실행 중인 워커는 요청 타임아웃이 남은 예산으로 잘려 있어 deadline 직후 종료됨
+        # (남는 스레드 수와 정리 시간은 loadtest.py 의 leftover/drain 열로 측정)
+        executor.shutdown(wait=not not_done, cancel_futures=True)
+        results.extend(f.result() for f in done)
+        results.extend((futures[f], ("fail", tuple()), False) for f in not_done)
 
     result_by_status = {
         "rain_detected": [],
         "no_rain": [],
         "pass": [],
         "fail": [],
+        "stale": [],
     }
 
 
-    for d, status in results:
+    for d, status, stale in sorted(results):
         result_by_status[status[0]].append(d)
+        if stale:
+            result_by_status["stale"].append(d)
 
     return result_by_status
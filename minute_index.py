@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_DAY = 24 * 60
+
+def hhmm_to_minute(hhmm: str) -> int:
+    return int(hhmm[:2]) * 60 + int(hhmm[2:4])
+
+def minute_to_hhmm(minute: int, sep: str = "") -> str:
+    return f"{minute // 60:02d}{sep}{minute % 60:02d}"
+
+
+# 하루 1440분 강수/수신 여부 + 누적합 인덱스. 임의 시간창 질의를 네트워크 없이 O(1)로 처리
+class MinuteIndex:
+    def __init__(self, rain: np.ndarray, present: np.ndarray | None = None, synthesized: np.ndarray | None = None):
+        self.rain = rain.astype(bool)
+        self.present = np.ones(MINUTES_PER_DAY, dtype=bool) if present is None else present.astype(bool)
+        # 실제 수신이 아니라 "관측 없음"으로 채워 넣은 분 (확정 저장 금지 판단용)
+        self.synthesized = synthesized if synthesized is not None and synthesized.any() else None
+        # 하루 최대 1440 이므로 int16 누적합 (지난 날짜 인덱스를 오래 보관하기 위해 작게 유지)
+        self.rain_prefix = np.zeros(MINUTES_PER_DAY + 1, dtype=np.int16)
+        self.present_prefix = np.zeros(MINUTES_PER_DAY + 1, dtype=np.int16)
+        np.cumsum(self.rain, dtype=np.int16, out=self.rain_prefix[1:])
+        np.cumsum(self.present, dtype=np.int16, out=self.present_prefix[1:])
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "MinuteIndex":
+        rain = np.zeros(MINUTES_PER_DAY, dtype=bool)
+        present = np.zeros(MINUTES_PER_DAY, dtype=bool)
+        hhmm = df['YYMMDDHHMI'].astype(str).str[-4:]
+        minutes = pd.to_numeric(hhmm.str[:2], errors='coerce') * 60 + pd.to_numeric(hhmm.str[2:], errors='coerce')
+        re = pd.to_numeric(df['RE'], errors='coerce').fillna(0)
+        valid = minutes.notna() & (minutes >= 0) & (minutes < MINUTES_PER_DAY)
+        present[minutes[valid].astype(int).to_numpy()] = True
+        rain[minutes[valid & (re != 0)].astype(int).to_numpy()] = True
+        return cls(rain, present)
+
+    def merge(self, newer: "MinuteIndex") -> "MinuteIndex":
+        # 새로 받은 분은 덮어쓰고, 받지 못한 분은 기존 값 유지
+        rain = np.where(newer.present, newer.rain, self.rain)
+        synthesized = None
+        if self.synthesized is not None:
+            synthesized = self.synthesized & ~newer.present
+        if newer.synthesized is not None:
+            synthesized = newer.synthesized if synthesized is None else synthesized | newer.synthesized
+        return MinuteIndex(rain, self.present | newer.present, synthesized)
+
+    def synthesized_count(self, time_start: str, time_end: str) -> int:
+        if self.synthesized is None:
+            return 0
+        start, end = hhmm_to_minute(time_start), hhmm_to_minute(time_end)
+        return int(self.synthesized[start:end + 1].sum()) if end >= start else 0
+
+    @staticmethod
+    def _count(prefix: np.ndarray, time_start: str, time_end: str) -> int:
+        start, end = hhmm_to_minute(time_start), hhmm_to_minute(time_end)
+        if end < start:
+            return 0
+        return int(prefix[end + 1] - prefix[start])
+
+    def rain_count(self, time_start: str, time_end: str) -> int:
+        return self._count(self.rain_prefix, time_start, time_end)
+
+    def missing_count(self, time_start: str, time_end: str, trailing_grace: int = 0) -> int:
+        # trailing_grace: 아직 수신되지 않았을 수 있는 마지막 N분은 누락으로 세지 않음
+        start, end = hhmm_to_minute(time_start), hhmm_to_minute(time_end) - trailing_grace
+        if end < start:
+            return 0
+        return (end - start + 1) - int(self.present_prefix[end + 1] - self.present_prefix[start])
+
+    def missing_ranges(self, time_start: str, time_end: str, merge_within: int = 0, skip: np.ndarray | None = None) -> list[tuple[str, str]]:
+        # 빠진 분 구간을 (시작, 끝) HHMM 목록으로. merge_within 분 이내로 떨어진 구간은 한 번에 조회
+        # skip: 지금은 다시 조회하지 않을 분 (재시도 대기 중)
+        start, end = hhmm_to_minute(time_start), hhmm_to_minute(time_end)
+        if end < start or self.missing_count(time_start, time_end) == 0:
+            return []
+        mask = ~self.present[start:end + 1]
+        if skip is not None:
+            mask &= ~skip[start:end + 1]
+        missing = np.flatnonzero(mask) + start
+        if not missing.size:
+            return []
+        breaks = np.flatnonzero(np.diff(missing) > merge_within + 1)
+        run_starts = np.concatenate(([missing[0]], missing[breaks + 1]))
+        run_ends = np.concatenate((missing[breaks], [missing[-1]]))
+        return [(minute_to_hhmm(int(a)), minute_to_hhmm(int(b))) for a, b in zip(run_starts, run_ends)]
+
+    def rain_times(self, time_start: str, time_end: str) -> tuple[str, ...]:
+        start, end = hhmm_to_minute(time_start), hhmm_to_minute(time_end)
+        if self.rain_count(time_start, time_end) == 0:
+            return tuple()
+        return tuple(minute_to_hhmm(m, ":") for m in np.flatnonzero(self.rain[start:end + 1]) + start)
+
+    def hourly_rain_counts(self, time_start: str = "0000", time_end: str = "2359") -> dict[int, int]:
+        start, end = hhmm_to_minute(time_start), hhmm_to_minute(time_end)
+        counts = {}
+        for hour in range(start // 60, end // 60 + 1):
+            lo, hi = max(start, hour * 60), min(end, hour * 60 + 59)
+            counts[hour] = int(self.rain_prefix[hi + 1] - self.rain_prefix[lo])
+        return counts
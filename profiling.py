@@ -0,0 +1,234 @@
+import cProfile
+import io
+import os
+import pstats
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import Counter, deque
+from contextlib import contextmanager
+from datetime import datetime
+import streamlit as st
+from config import Config
+
+# 스레드별 현재 프로파일 실행 (꺼져 있으면 None → 오버헤드 없음)
+_local = threading.local()
+# cProfile(3.12+ sys.monitoring), tracemalloc 모두 프로세스 전역이므로 동시에 1개만 실행
+_run_lock = threading.Lock()
+
+
+@st.cache_resource(show_spinner=False)
+def get_profile_ring() -> deque:
+    return deque(maxlen=Config.PROFILE_RING_SIZE)
+
+
+def is_profiling_requested() -> bool:
+    if os.environ.get(Config.PROFILE_ENV) == "1":
+        return True
+    return bool(st.session_state.get("profile_next_rerun"))
+
+
+def current_run():
+    return getattr(_local, "run", None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_firstlineno}:{code.co_name}"
+
+
+class StackSampler:
+    # 실행에 참여한 스레드의 실제 호출 스택을 주기적으로 샘플링 -> collapsed stack
+    # (pstats 호출 그래프를 펼치지 않으므로 비용은 샘플 수 × 스택 깊이로 제한됨)
+    def __init__(self, interval: float = Config.PROFILE_SAMPLE_INTERVAL, max_depth: int = Config.PROFILE_MAX_DEPTH):
+        self.interval = interval
+        self.max_depth = max_depth
+        self.samples = Counter()
+        self._threads = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def add_thread(self, ident: int, role: str):
+        with self._lock:
+            self._threads[ident] = role
+
+    def remove_thread(self, ident: int):
+        with self._lock:
+            self._threads.pop(ident, None)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        with self._lock:
+            threads = dict(self._threads)
+        frames = sys._current_frames()
+        for ident, role in threads.items():
+            frame = frames.get(ident)
+            stack = []
+            while frame is not None and len(stack) < self.max_depth:
+                stack.append(_frame_label(frame))
+                frame = frame.f_back
+            if stack:
+                stack.append(role)
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        # flamegraph.pl / speedscope 입력 (값: 샘플 수)
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+
+class ProfileRun:
+    def __init__(self, label: str):
+        self.label = label
+        self.started_at = datetime.now()
+        self.elapsed = 0.0
+        self.profiler = cProfile.Profile()
+        self.sampler = StackSampler()
+        self.snapshot = None
+        self._thread_profiles = []
+        self._lock = threading.Lock()
+
+    def wrap(self, fn):
+        # 3.12 이상은 sys.monitoring 기반으로 메인 프로파일러가 모든 스레드를 수집
+        per_thread_profile = sys.version_info < (3, 12)
+
+        def wrapped(*args, **kwargs):
+            ident = threading.get_ident()
+            self.sampler.add_thread(ident, "worker")
+            prof = cProfile.Profile() if per_thread_profile else None
+            if prof:
+                prof.enable()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                if prof:
+                    prof.disable()
+                    with self._lock:
+                        self._thread_profiles.append(prof)
+                self.sampler.remove_thread(ident)
+        return wrapped
+
+    def stats(self) -> pstats.Stats:
+        stats = pstats.Stats(self.profiler)
+        for prof in self._thread_profiles:
+            stats.add(prof)
+        return stats
+
+
+class ProfileResult:
+    def __init__(self, run: ProfileRun):
+        stats = run.stats()
+        self.label = run.label
+        self.started_at = run.started_at
+        self.elapsed = run.elapsed
+        self.thread_count = len(run._thread_profiles)
+        self.pstats_bytes = _dump_to_bytes(stats.dump_stats)
+        self.folded = run.sampler.folded()
+        self.sample_count = sum(run.sampler.samples.values())
+        self.summary = _stats_summary(stats)
+        self.tracemalloc_bytes = _dump_to_bytes(run.snapshot.dump) if run.snapshot else b""
+        self.alloc_summary = _alloc_summary(run.snapshot) if run.snapshot else ""
+
+    @property
+    def file_stem(self) -> str:
+        return f"rain_{self.started_at.strftime('%Y%m%d_%H%M%S')}"
+
+
+def _dump_to_bytes(dump) -> bytes:
+    fd, path = tempfile.mkstemp()
+    os.close(fd)
+    try:
+        dump(path)
+        with open(path, "rb") as f:
+            return f.read()
+    finally:
+        os.remove(path)
+
+
+def _stats_summary(stats: pstats.Stats, limit: int = 30) -> str:
+    buf = io.StringIO()
+    stats.stream = buf
+    stats.sort_stats("cumulative").print_stats(limit)
+    return buf.getvalue()
+
+
+def _alloc_summary(snapshot, limit: int = 20) -> str:
+    lines = []
+    for stat in snapshot.statistics("lineno")[:limit]:
+        frame = stat.traceback[0]
+        lines.append(f"{stat.size / 1024:10.1f} KiB {stat.count:8d} blocks  {frame.filename}:{frame.lineno}")
+    return "\n".join(lines)
+
+
+@contextmanager
+def profile_rerun(label: str = "rerun"):
+    if not is_profiling_requested() or not _run_lock.acquire(blocking=False):
+        yield None
+        return
+
+    # 관리자 토글은 1회성
+    st.session_state.profile_next_rerun = False
+    run = ProfileRun(label)
+    _local.run = run
+    started_tracemalloc = not tracemalloc.is_tracing()
+    if started_tracemalloc:
+        tracemalloc.start(Config.PROFILE_TRACEMALLOC_FRAMES)
+    run.sampler.add_thread(threading.get_ident(), "main")
+    run.sampler.start()
+    t0 = time.perf_counter()
+    run.profiler.enable()
+    try:
+        yield run
+    finally:
+        run.profiler.disable()
+        run.elapsed = time.perf_counter() - t0
+        run.sampler.stop()
+        try:
+            run.snapshot = tracemalloc.take_snapshot()
+            if started_tracemalloc:
+                tracemalloc.stop()
+        finally:
+            _local.run = None
+            _run_lock.release()
+        # 결과 정리는 잠금 밖에서 (다른 세션의 프로파일링을 막지 않음)
+        get_profile_ring().append(ProfileResult(run))
+
+
+def render_profile_admin():
+    st.subheader("🔬 실행 프로파일링")
+    st.caption(
+        f"다음 실행 1회의 cProfile 호출 그래프와 tracemalloc 스냅샷을 저장합니다. "
+        f"(최근 {Config.PROFILE_RING_SIZE}개 보관, 환경변수 `{Config.PROFILE_ENV}=1` 이면 매 실행 기록)"
+    )
+    if st.button("⏺️ 다음 실행 프로파일링"):
+        st.session_state.profile_next_rerun = True
+        st.info("다음 조회(실행) 시 프로파일링됩니다.")
+
+    ring = list(get_profile_ring())
+    if not ring:
+        st.write("저장된 프로파일이 없습니다.")
+        return
+
+    for i, result in enumerate(reversed(ring)):
+        title = f"{result.started_at.strftime('%Y-%m-%d %H:%M:%S')} | {result.label} | {result.elapsed:.2f}s"
+        with st.expander(title):
+            st.write(f"워커 스레드 프로파일: {result.thread_count}개, 스택 샘플: {result.sample_count}개")
+            st.code(result.summary)
+            if result.alloc_summary:
+                st.code(result.alloc_summary)
+            cols = st.columns(3)
+            cols[0].download_button("pstats", result.pstats_bytes, file_name=f"{result.file_stem}.prof", key=f"profile_pstats_{result.file_stem}_{i}")
+            cols[1].download_button("flamegraph", result.folded, file_name=f"{result.file_stem}.folded", key=f"profile_folded_{result.file_stem}_{i}")
+            cols[2].download_button("tracemalloc", result.tracemalloc_bytes, file_name=f"{result.file_stem}.tracemalloc", key=f"profile_malloc_{result.file_stem}_{i}")
@@ -0,0 +1,154 @@
+import itertools
+import json
+import time
+from datetime import date
+from typing import NamedTuple
+import numpy as np
+import streamlit as st
+from config import Config
+from minute_index import MINUTES_PER_DAY, hhmm_to_minute
+
+# 아카이브 상태값 중 비포 대상이 아닌 날
+NON_BUSINESS_STATUS = "Weekend or Holiday"
+
+
+class Rule(NamedTuple):
+    time_start: str = Config.TIME_START
+    time_end: str = Config.TIME_END
+    min_minutes: int = 1
+    min_re: float = 0.0
+    monthly_cap: int | None = 5
+
+    @property
+    def label(self) -> str:
+        cap = "∞" if self.monthly_cap is None else self.monthly_cap
+        return f"{self.time_start}-{self.time_end} ≥{self.min_minutes}분 RE≥{self.min_re:g} 월{cap}회"
+
+
+# 날짜 × 1440분 강수량 행렬 (아카이브는 강수 여부만 있으므로 비 온 분 = 1.0)
+class RainArchive:
+    def __init__(self, dates: list[date], values: np.ndarray, business: np.ndarray, coverage: tuple[str, str] = (Config.DAY_START, Config.DAY_END)):
+        self.dates = dates
+        self.values = values
+        self.business = business
+        self.coverage = coverage
+        month_keys = np.array([d.year * 12 + d.month - 1 for d in dates])
+        # 날짜가 정렬되어 있으므로 월 경계 인덱스로 reduceat
+        self.month_starts = np.flatnonzero(np.r_[True, month_keys[1:] != month_keys[:-1]])
+        self.months = [(int(k) // 12, int(k) % 12 + 1) for k in month_keys[self.month_starts]]
+        self._prefix_cache: dict[float, np.ndarray] = {}
+
+    @classmethod
+    def from_json(cls, archive: dict) -> "RainArchive":
+        status_by_date = archive.get("rain_status_by_date", {})
+        minutes_by_date = archive.get("rain_minutes_by_date", {})
+        date_strs = sorted(set(status_by_date) | set(minutes_by_date))
+        dates = [date.fromisoformat(s) for s in date_strs]
+        values = np.zeros((len(dates), MINUTES_PER_DAY), dtype=np.float32)
+        for row, date_str in enumerate(date_strs):
+            minutes = [hhmm_to_minute(m[-4:]) for m in minutes_by_date.get(date_str, [])]
+            values[row, minutes] = 1.0
+        # logic.is_business_day 와 같이 5월 1일은 비포 대상이 아님 (아카이브에는 평일로 기록된 해가 있음)
+        business = np.array([
+            status_by_date.get(s) != NON_BUSINESS_STATUS and (d.month, d.day) != (5, 1)
+            for s, d in zip(date_strs, dates)
+        ])
+        # 아카이브는 비포 시간창 안의 강수 분만 기록됨
+        return cls(dates, values, business, coverage=(Config.TIME_START, Config.TIME_END))
+
+    @classmethod
+    def load(cls, path: str = Config.ARCHIVE_FILE) -> "RainArchive":
+        with open(path, encoding="utf-8") as f:
+            return cls.from_json(json.load(f))
+
+    def covers(self, rule: Rule) -> bool:
+        return self.coverage[0] <= rule.time_start and rule.time_end <= self.coverage[1]
+
+    def rain_prefix(self, min_re: float) -> np.ndarray:
+        # 강수 기준별 분 누적합 (날짜 × 1441)
+        if min_re not in self._prefix_cache:
+            rainy = self.values >= min_re if min_re > 0 else self.values != 0
+            prefix = np.zeros((len(self.dates), MINUTES_PER_DAY + 1), dtype=np.int16)
+            np.cumsum(rainy, axis=1, dtype=np.int16, out=prefix[:, 1:])
+            self._prefix_cache[min_re] = prefix
+        return self._prefix_cache[min_re]
+
+
+class SimulationResult:
+    def __init__(self, rules: list[Rule], months: list[tuple[int, int]], rain_days: np.ndarray, notified: np.ndarray, covered: np.ndarray):
+        self.rules = rules
+        self.months = months
+        # 규칙 × 월 비포 일수, 상한 적용 자동알림 수
+        self.rain_days = rain_days
+        self.notified = notified
+        self.covered = covered
+
+    def totals(self) -> np.ndarray:
+        return self.rain_days.sum(axis=1)
+
+    def to_frame(self):
+        import pandas as pd
+
+        rows = []
+        for r, rule in enumerate(self.rules):
+            for m, (year, month) in enumerate(self.months):
+                rows.append({
+                    "rule": rule.label, "year": year, "month": month,
+                    "rain_days": int(self.rain_days[r, m]), "notified": int(self.notified[r, m]),
+                    "covered": bool(self.covered[r]),
+                })
+        return pd.DataFrame(rows)
+
+
+def simulate(archive: RainArchive, rules: list[Rule]) -> SimulationResult:
+    starts = np.array([hhmm_to_minute(r.time_start) for r in rules])
+    ends = np.array([hhmm_to_minute(r.time_end) for r in rules])
+    min_minutes = np.array([r.min_minutes for r in rules])
+    caps = np.array([np.iinfo(np.int32).max if r.monthly_cap is None else r.monthly_cap for r in rules])
+
+    hits = np.zeros((len(archive.dates), len(rules)), dtype=np.int32)
+    # 같은 강수 기준끼리 묶어 누적합 한 번으로 모든 시간창을 계산
+    for min_re in sorted({r.min_re for r in rules}):
+        cols = np.array([i for i, r in enumerate(rules) if r.min_re == min_re])
+        prefix = archive.rain_prefix(min_re)
+        counts = prefix[:, ends[cols] + 1] - prefix[:, starts[cols]]
+        hits[:, cols] = (counts >= min_minutes[cols]) & archive.business[:, None]
+
+    rain_days = np.add.reduceat(hits, archive.month_starts, axis=0).T
+    notified = np.minimum(rain_days, caps[:, None])
+    covered = np.array([archive.covers(r) for r in rules])
+    return SimulationResult(rules, archive.months, rain_days, notified, covered)
+
+
+def rule_grid(starts, ends, min_minutes=(1,), min_re=(0.0,), monthly_caps=(5,)) -> list[Rule]:
+    return [
+        Rule(s, e, m, re, cap)
+        for s, e, m, re, cap in itertools.product(starts, ends, min_minutes, min_re, monthly_caps)
+        if s <= e
+    ]
+
+
+@st.cache_resource(show_spinner=False)
+def get_rain_archive() -> RainArchive:
+    return RainArchive.load()
+
+
+if __name__ == "__main__":
+    t0 = time.perf_counter()
+    archive = RainArchive.load()
+    t_load = time.perf_counter() - t0
+
+    rules = rule_grid(
+        starts=[f"{h:02d}{m:02d}" for h in range(9, 12) for m in (0, 30)],
+        ends=[f"{h:02d}{m:02d}" for h in range(15, 18) for m in (0, 30)],
+        min_minutes=(1, 3, 5, 10, 30),
+        monthly_caps=(5, None),
+    )
+    t0 = time.perf_counter()
+    result = simulate(archive, rules)
+    t_sim = time.perf_counter() - t0
+
+    print(f"archive: {len(archive.dates)} days ({archive.dates[0]} ~ {archive.dates[-1]}), load {t_load * 1000:.1f} ms")
+    print(f"rules: {len(rules)}, months: {len(result.months)}, simulate {t_sim * 1000:.1f} ms")
+    baseline = rules.index(Rule())
+    print(f"baseline {rules[baseline].label}: {int(result.totals()[baseline])}일")
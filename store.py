@@ -0,0 +1,92 @@
+import json
+import os
+import threading
+from datetime import date
+import streamlit as st
+from config import Config
+
+# 아카이브 JSON 상태값 -> check_bipo_status 상태값
+ARCHIVE_STATUS_MAP = {
+    "Rain": "rain_detected",
+    "No Rain": "no_rain",
+    "Weekend or Holiday": "pass",
+}
+
+# 확정 저장 대상 상태 (fail 은 다시 조회해야 하므로 저장하지 않음)
+FINAL_STATUSES = ("rain_detected", "no_rain", "pass")
+
+
+# (관측소, 날짜, 시간창) -> (상태, 비 온 시각 목록) 확정 결과 저장소
+class DayStatusStore:
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: dict[tuple[str, str, str, str], tuple[str, tuple[str, ...]]] = {}
+
+    @staticmethod
+    def _key(stn: str, date_obj: date, window: tuple[str, str]) -> tuple[str, str, str, str]:
+        return stn, date_obj.isoformat(), window[0], window[1]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, stn: str, date_obj: date, window: tuple[str, str]) -> tuple[str, tuple[str, ...]] | None:
+        return self._data.get(self._key(stn, date_obj, window))
+
+    def put(self, stn: str, date_obj: date, window: tuple[str, str], status: str, rain_times=(), persist: bool = True):
+        if status not in FINAL_STATUSES:
+            return
+        key = self._key(stn, date_obj, window)
+        value = (status, tuple(rain_times))
+        with self._lock:
+            if self._data.get(key) == value:
+                return
+            self._data[key] = value
+            if persist and self.path:
+                self._append(key, value)
+
+    def _append(self, key, value):
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        record = {
+            "stn": key[0], "date": key[1], "start": key[2], "end": key[3],
+            "status": value[0], "rain_times": list(value[1]),
+        }
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    def load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    r = json.loads(line)
+                    self._data[(r["stn"], r["date"], r["start"], r["end"])] = (r["status"], tuple(r["rain_times"]))
+                except (ValueError, KeyError):
+                    # 중간에 끊긴 마지막 줄 등은 무시
+                    continue
+
+    def seed_from_archive(self, archive_path: str, stn: str = Config.STATION_CODE,
+                          window: tuple[str, str] = (Config.TIME_START, Config.TIME_END)):
+        if not os.path.exists(archive_path):
+            return
+        with open(archive_path, encoding="utf-8") as f:
+            archive = json.load(f)
+
+        rain_minutes = archive.get("rain_minutes_by_date", {})
+        for date_str, archived in archive.get("rain_status_by_date", {}).items():
+            status = ARCHIVE_STATUS_MAP.get(archived)
+            if status is None:
+                continue
+            minutes = rain_minutes.get(date_str, [])
+            rain_times = tuple(f"{m[-4:-2]}:{m[-2:]}" for m in minutes if window[0] <= m[-4:] <= window[1])
+            self._data[(stn, date_str, window[0], window[1])] = (status, rain_times)
+
+
+@st.cache_resource(show_spinner=False)
+def get_day_status_store() -> DayStatusStore:
+    store = DayStatusStore(Config.DAY_STATUS_FILE)
+    store.seed_from_archive(Config.ARCHIVE_FILE)
+    # 아카이브 이후 확정된 날짜는 파일에서 덮어씀
+    store.load()
+    return store
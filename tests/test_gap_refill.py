@@ -0,0 +1,237 @@
+import os
+import sys
+import time
+from datetime import date, datetime
+
+import pandas as pd
+import pytest
+import pytz
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import api  # noqa: E402
+import logic  # noqa: E402
+from api import CachedFrame, get_frame_cache  # noqa: E402
+from config import Config  # noqa: E402
+from minute_index import MinuteIndex, hhmm_to_minute  # noqa: E402
+from store import DayStatusStore  # noqa: E402
+
+SEOUL = pytz.timezone("Asia/Seoul")
+TODAY = date(2025, 7, 7)  # 월요일
+
+
+def minute_frame(date_obj: date, minutes) -> pd.DataFrame:
+    return pd.DataFrame({
+        "YYMMDDHHMI": [f"{date_obj:%Y%m%d}{m // 60:02d}{m % 60:02d}" for m in minutes],
+        "RE": [0.0] * len(minutes),
+    })
+
+
+class FakeKma:
+    # 요청받은 구간 중 never 에 있는 분은 끝내 돌려주지 않는 대역
+    def __init__(self, never=()):
+        self.never = set(never)
+        self.calls = []
+
+    def __call__(self, date_obj, auth_key, time_start=Config.DAY_START, time_end=Config.DAY_END, timeout=None, hedge=False):
+        self.calls.append((time_start, time_end))
+        minutes = range(hhmm_to_minute(time_start), hhmm_to_minute(time_end) + 1)
+        return minute_frame(date_obj, [m for m in minutes if m not in self.never])
+
+
+def freeze_clock(monkeypatch, hhmm: str, day: date = TODAY):
+    now = SEOUL.localize(datetime(day.year, day.month, day.day, int(hhmm[:2]), int(hhmm[2:])))
+
+    class FakeDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return now.astimezone(tz) if tz else now.replace(tzinfo=None)
+
+    monkeypatch.setattr(logic, "datetime", FakeDatetime)
+
+
+@pytest.fixture
+def env(monkeypatch, tmp_path):
+    get_frame_cache.clear()
+    store = DayStatusStore(str(tmp_path / "day_status.jsonl"))
+    monkeypatch.setattr(logic, "get_day_status_store", lambda: store)
+    kma = FakeKma()
+    monkeypatch.setattr(api, "fetch_rain_data_raw", kma)
+    yield store, kma
+    get_frame_cache.clear()
+
+
+def cache_day(date_obj: date, minutes, time_end: str = Config.DAY_END):
+    get_frame_cache().put(Config.STATION_CODE, date_obj, CachedFrame(Config.DAY_START, time_end, MinuteIndex.from_frame(minute_frame(date_obj, minutes))))
+
+
+def test_midday_trailing_minutes_are_not_missing(monkeypatch, env):
+    store, kma = env
+    freeze_clock(monkeypatch, "1230")
+    # 12:26~12:29 는 아직 KMA 에 올라오지 않음
+    kma.never = set(range(hhmm_to_minute("1226"), hhmm_to_minute("1230")))
+    cache_day(TODAY, range(hhmm_to_minute("1226")), time_end="1225")
+
+    assert not logic.is_day_finalized(TODAY)
+    status, stale = logic.resolve_day_status(TODAY, "key", {}, time.monotonic() + Config.QUERY_BUDGET)
+
+    assert status == ("no_rain", ())
+    assert not stale
+    # 수신 대기 중인 최근 분은 재시도 횟수에 포함하지 않고, 진행 중인 날은 저장하지 않음
+    assert get_frame_cache().get(Config.STATION_CODE, TODAY).gap_retries == {}
+    assert store.get(Config.STATION_CODE, TODAY, (Config.TIME_START, Config.TIME_END)) is None
+
+
+def test_undecidable_window_waits_for_refill_within_budget(monkeypatch, env):
+    _, kma = env
+    freeze_clock(monkeypatch, "1230")
+    monkeypatch.setattr(Config, "SWR_GRACE", 0.05)
+    cache_day(TODAY, range(hhmm_to_minute("1101")), time_end="1100")
+
+    def slow_kma(*args, **kwargs):
+        time.sleep(0.3)
+        return FakeKma()(*args, **kwargs)
+    monkeypatch.setattr(api, "fetch_rain_data_raw", slow_kma)
+
+    # 11:00 까지의 데이터로는 10:00~12:29 판정 불가 -> SWR_GRACE 를 넘겨도 재조회를 기다림
+    status, stale = logic.resolve_day_status(TODAY, "key", {}, time.monotonic() + Config.QUERY_BUDGET)
+    assert status == ("no_rain", ())
+    assert not stale
+
+
+def test_decided_window_only_waits_swr_grace(monkeypatch, env):
+    freeze_clock(monkeypatch, "1230")
+    monkeypatch.setattr(Config, "SWR_GRACE", 0.05)
+    index = MinuteIndex.from_frame(minute_frame(TODAY, range(hhmm_to_minute("1101"))))
+    index.rain[hhmm_to_minute("1030")] = True
+    get_frame_cache().put(Config.STATION_CODE, TODAY, CachedFrame(Config.DAY_START, "1100", MinuteIndex(index.rain, index.present)))
+
+    def slow_kma(*args, **kwargs):
+        time.sleep(1.0)
+        return FakeKma()(*args, **kwargs)
+    monkeypatch.setattr(api, "fetch_rain_data_raw", slow_kma)
+
+    # 이미 비가 확인된 시간창은 느린 재조회를 기다리지 않음
+    t0 = time.monotonic()
+    status, stale = logic.resolve_day_status(TODAY, "key", {}, time.monotonic() + Config.QUERY_BUDGET)
+    assert time.monotonic() - t0 < 0.5
+    assert status == ("rain_detected", ("10:30",))
+    assert stale
+
+
+PAST_DAY = date(2025, 7, 1)
+NOON = hhmm_to_minute("1200")
+WINDOW = (Config.TIME_START, Config.TIME_END)
+
+
+@pytest.fixture
+def fast_retries(monkeypatch):
+    monkeypatch.setattr(Config, "MAX_GAP_ATTEMPTS", 3)
+    monkeypatch.setattr(Config, "GAP_RETRY_BACKOFF", 0.05)
+    monkeypatch.setattr(Config, "GAP_RETRY_MAX_BACKOFF", 0.1)
+    monkeypatch.setattr(Config, "GAP_ACCEPT_AFTER", 0.5)
+
+
+def resolve_past_day():
+    return logic.resolve_day_status(PAST_DAY, "key", {}, time.monotonic() + Config.QUERY_BUDGET)
+
+
+def gap_state():
+    entry = get_frame_cache().get(Config.STATION_CODE, PAST_DAY)
+    return entry.gap_retries.get(NOON), entry.gap_accepted
+
+
+def test_missing_minute_backs_off_between_attempts(monkeypatch, env, fast_retries):
+    store, kma = env
+    kma.never = {NOON}
+    cache_day(PAST_DAY, [m for m in range(1440) if m != NOON])
+
+    assert resolve_past_day() == (("fail", ()), True)
+    assert len(kma.calls) == 1
+    assert gap_state()[0][0] == 1
+
+    # 대기 중에는 다시 조회하지 않음
+    assert resolve_past_day() == (("fail", ()), True)
+    assert len(kma.calls) == 1
+
+    time.sleep(0.06)
+    resolve_past_day()
+    assert len(kma.calls) == 2
+    assert gap_state()[0][0] == 2
+    assert store.get(Config.STATION_CODE, PAST_DAY, WINDOW) is None
+
+
+def test_minute_arriving_on_retry_clears_state_and_persists(monkeypatch, env, fast_retries):
+    store, kma = env
+    kma.never = {NOON}
+    cache_day(PAST_DAY, [m for m in range(1440) if m != NOON])
+    resolve_past_day()
+
+    kma.never = set()
+    time.sleep(0.06)
+    assert resolve_past_day() == (("no_rain", ()), False)
+    assert gap_state() == (None, None)
+    assert store.get(Config.STATION_CODE, PAST_DAY, WINDOW) == ("no_rain", ())
+
+
+def test_accepted_minute_needs_attempts_and_time_and_is_never_persisted(monkeypatch, env, fast_retries):
+    store, kma = env
+    kma.never = {NOON}
+    cache_day(PAST_DAY, [m for m in range(1440) if m != NOON])
+
+    t0 = time.monotonic()
+    while len(kma.calls) < Config.MAX_GAP_ATTEMPTS:
+        resolve_past_day()
+        time.sleep(0.02)
+    # 시도 횟수는 채웠지만 GAP_ACCEPT_AFTER 전이면 계속 누락(fail)
+    if time.monotonic() - t0 < Config.GAP_ACCEPT_AFTER:
+        assert gap_state()[1] is None
+        assert resolve_past_day()[0] == ("fail", ())
+
+    while gap_state()[1] is None:
+        assert time.monotonic() - t0 < 5
+        time.sleep(0.05)
+        resolve_past_day()
+
+    # 관측 없음으로 채운 분: 판정은 하되 재조회·확정 저장은 하지 않음
+    calls = len(kma.calls)
+    assert resolve_past_day() == (("no_rain", ()), False)
+    assert len(kma.calls) == calls
+    assert store.get(Config.STATION_CODE, PAST_DAY, WINDOW) is None
+    index = get_frame_cache().get(Config.STATION_CODE, PAST_DAY).index
+    assert index.synthesized_count(*WINDOW) == 1
+
+
+def test_today_repeat_query_reuses_frame_within_minute(monkeypatch, env):
+    _, kma = env
+    freeze_clock(monkeypatch, "1230")
+
+    class FakeDate(date):
+        @classmethod
+        def today(cls):
+            return TODAY
+    monkeypatch.setattr(api, "date", FakeDate)
+    monkeypatch.setattr(time, "time", lambda: 1_751_858_000.0)
+
+    def rainy_kma(date_obj, auth_key, time_start=Config.DAY_START, time_end=Config.DAY_END, timeout=None, hedge=False):
+        df = kma(date_obj, auth_key, time_start, time_end)
+        df.loc[df["YYMMDDHHMI"] == f"{date_obj:%Y%m%d}1030", "RE"] = 0.5
+        return df
+    monkeypatch.setattr(api, "fetch_rain_data_raw", rainy_kma)
+
+    deadline = time.monotonic() + Config.QUERY_BUDGET
+    first, _ = logic.resolve_day_status(TODAY, "key", {}, deadline)
+    # 같은 분 안의 반복 조회와 시간대별 보기는 KMA 를 다시 부르지 않음
+    second, stale = logic.resolve_day_status(TODAY, "key", {}, deadline)
+    hourly = logic.get_hourly_rain_counts(TODAY, "key", Config.TIME_START, "1229", deadline)
+
+    assert first == second == ("rain_detected", ("10:30",))
+    assert not stale
+    assert hourly[10] == 1
+    assert kma.calls == [(Config.DAY_START, "1229")]
+
+    # 다음 분이 되면 오늘 데이터는 더 이상 최신이 아님
+    entry = get_frame_cache().get(Config.STATION_CODE, TODAY)
+    assert entry.is_fresh(TODAY)
+    monkeypatch.setattr(time, "time", lambda: 1_751_858_000.0 + 60)
+    assert not entry.is_fresh(TODAY)
@@ -0,0 +1,25 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import Config  # noqa: E402
+from hedge import HedgeMetrics  # noqa: E402
+
+
+def test_cut_primaries_stay_out_of_latency_distribution():
+    metrics = HedgeMetrics()
+    for _ in range(Config.HEDGE_MIN_SAMPLES * 2):
+        metrics.count_request()
+        metrics.record_primary(0.5)
+    delay = metrics.hedge_delay()
+
+    # 헤지에 밀려 끊긴 원 요청의 경과 시간은 실제 지연의 하한일 뿐
+    for _ in range(5):
+        metrics.record_cut(0.21)
+
+    m = metrics.snapshot()
+    assert metrics.hedge_delay() == delay
+    assert m["primary_p99"] == 0.5
+    assert m["cut_primaries"] == 5
+    assert m["cut_min"] == 0.21
@@ -0,0 +1,61 @@
+import io
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import profiling  # noqa: E402
+from config import Config  # noqa: E402
+
+
+def pandas_workload(seed: int):
+    # 수백 개 함수가 얽힌 실제 pandas 호출 그래프를 만들기 위한 작업
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({"key": rng.integers(0, 50, 20000), "value": rng.random(20000)})
+    csv = df.to_csv(index=False)
+    df = pd.read_csv(io.StringIO(csv))
+    df["bucket"] = pd.cut(df["value"], 10)
+    summary = df.groupby(["key", "bucket"], observed=True)["value"].agg(["sum", "mean", "count"])
+    return summary.reset_index().merge(df.head(500), on="key").shape
+
+
+def test_large_profile_result_is_bounded(monkeypatch):
+    monkeypatch.setenv(Config.PROFILE_ENV, "1")
+    profiling.get_profile_ring().clear()
+
+    with profiling.profile_rerun("test") as run:
+        assert run is not None
+        task = run.wrap(pandas_workload)
+        with ThreadPoolExecutor(4) as executor:
+            list(executor.map(task, range(8)))
+        pandas_workload(99)
+
+    result = profiling.get_profile_ring()[-1]
+    stats = run.stats()
+    assert len(stats.stats) > 500
+
+    # 결과 정리는 호출 그래프 크기와 무관하게 빨라야 함
+    t0 = time.perf_counter()
+    profiling.ProfileResult(run)
+    assert time.perf_counter() - t0 < 10
+
+    assert not profiling._run_lock.locked()
+    assert result.sample_count > 0
+    lines = result.folded.splitlines()
+    assert lines
+    roots = set()
+    total = 0
+    for line in lines:
+        stack, count = line.rsplit(" ", 1)
+        frames = stack.split(";")
+        assert len(frames) <= Config.PROFILE_MAX_DEPTH + 1
+        roots.add(frames[0])
+        total += int(count)
+    assert total == result.sample_count
+    assert {"main", "worker"} <= roots
+    assert any("groupby" in line or "read_csv" in line or "readers.py" in line for line in lines)
@@ -1,9 +1,10 @@
 import requests
 from datetime import datetime, timedelta, timezone
 import time
+from config import Config
 
 def get_ridibooks_server_time():
-    url = "https://ridibooks.com"
+    url = Config.RIDI_URL
     try:
         start = time.time()
         response = requests.head(url, timeout=5)
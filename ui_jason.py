@@ -4,14 +4,20 @@ import pandas as pd
 from datetime import datetime
 from collections import defaultdict
 import altair as alt
+from config import Config
+
+# 모든 탭이 매 재실행마다 렌더링되므로 아카이브는 한 번만 내려받음 (실패는 캐시하지 않음)
+@st.cache_data(show_spinner=False, ttl=Config.CACHE_TTL)
+def fetch_rain_archive():
+    resp = requests.get(Config.ARCHIVE_URL)
+    resp.raise_for_status()
+    return resp.json()
 
 def load_rain_data():
-    url = "https://raw.githubusercontent.com/117g/rain_streamlit/main/rainy_json_save_20200101-20250704.json"
-    resp = requests.get(url)
-    if resp.status_code == 200:
-        return resp.json()
-    else:
-        st.error(f"데이터 불러오기 실패 (status_code={resp.status_code})")
+    try:
+        return fetch_rain_archive()
+    except requests.HTTPError as e:
+        st.error(f"데이터 불러오기 실패 (status_code={e.response.status_code})")
         return None
 
 def preprocess_data(rain_minutes_by_date):
@@ -101,6 +107,50 @@ def render_rain_data_tab():
 
         st.altair_chart(line_chart, use_container_width=True)
 
+    render_rule_simulation()
+
+def render_rule_simulation():
+    from simulate import Rule, get_rain_archive, simulate
+
+    st.header("3. 비포 규칙 시뮬레이션")
+    archive = get_rain_archive()
+
+    col1, col2 = st.columns(2)
+    start_t = col1.time_input("시작 시각", value=Config.TIME_START_OBJ, step=1800, key="sim_start")
+    end_t = col2.time_input("종료 시각", value=Config.TIME_END_OBJ, step=1800, key="sim_end")
+    col1, col2 = st.columns(2)
+    min_minutes = col1.number_input("최소 강수 분", min_value=1, max_value=360, value=1, key="sim_min_minutes")
+    monthly_cap = col2.number_input("월 자동알림 상한", min_value=1, max_value=31, value=5, key="sim_cap")
+
+    if start_t > end_t:
+        st.warning("시작 시각이 종료 시각보다 늦을 수 없습니다.")
+        return
+
+    rule = Rule(start_t.strftime("%H%M"), end_t.strftime("%H%M"), int(min_minutes), 0.0, int(monthly_cap))
+    # 입력값이 현재 규칙과 같으면 한 번만 계산 (같은 이름의 두 계열이 합산되지 않도록)
+    rules = [Rule()] if rule == Rule() else [Rule(), rule]
+    result = simulate(archive, rules)
+    if not result.covered[-1]:
+        st.info(
+            f"아카이브에는 {archive.coverage[0][:2]}:{archive.coverage[0][2:]}~"
+            f"{archive.coverage[1][:2]}:{archive.coverage[1][2:]} 강수 기록만 있어 그 범위 밖은 반영되지 않습니다."
+        )
+
+    sim_df = result.to_frame()
+    sim_df["rule"] = sim_df["rule"].where(sim_df["rule"] != Rule().label, "현재 규칙: " + Rule().label)
+    yearly = sim_df.groupby(["rule", "year"], as_index=False)[["rain_days", "notified"]].sum()
+
+    bar_chart = alt.Chart(yearly).mark_bar().encode(
+        x=alt.X('year:O', title='연도'),
+        xOffset='rule:N',
+        y=alt.Y('rain_days:Q', title='비포 일수'),
+        color=alt.Color('rule:N', legend=alt.Legend(title="규칙", orient='bottom')),
+        tooltip=['rule', 'year', 'rain_days', 'notified']
+    ).properties(width=700, height=400)
+
+    st.altair_chart(bar_chart, use_container_width=True)
+    st.dataframe(yearly.pivot(index="year", columns="rule", values="notified"), use_container_width=True)
+
 # 아래는 Streamlit 탭 안에서 호출 예시
 def main():
     tabs = st.tabs(["기타 탭1", "기타 탭2", "기타 탭3", "Rain Data"])